@@ -0,0 +1,85 @@
+import time
+
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+CACHE_ALIAS = 'tokens'
+
+# Claims added to the tokens of a user at login, see
+# core.serializers.TokenObtainPairSerializer. Refresh tokens pass them on
+# to the access tokens they issue.
+ISSUED_AT_CLAIM = 'iat'
+CLAIMS = ('is_staff', 'customer_id', ISSUED_AT_CLAIM)
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def revoke_token(token):
+    # Denies a single token until it expires.
+    ttl = token['exp'] - time.time()
+    if ttl > 0:
+        get_cache().set(f'jti:{token[api_settings.JTI_CLAIM]}', True, timeout=ttl)
+
+
+def revoke_user_tokens(user_id):
+    # Denies every token of the user issued until now, e.g. after their
+    # password or permissions changed. Kept as long as tokens may live.
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    get_cache().set(f'user:{user_id}', time.time(), timeout=lifetime.total_seconds())
+
+
+def is_revoked(token):
+    token_key = f'jti:{token[api_settings.JTI_CLAIM]}'
+    user_key = f'user:{token[api_settings.USER_ID_CLAIM]}'
+    denied = get_cache().get_many([token_key, user_key])
+    if token_key in denied:
+        return True
+    return user_key in denied and token.get(ISSUED_AT_CLAIM, 0) <= denied[user_key]
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    # Loads the user of the token from the database, like simplejwt does,
+    # and rejects revoked tokens.
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        return token
+
+
+class StoreTokenUser(TokenUser):
+    @property
+    def customer_id(self):
+        return self.token['customer_id']
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    # Builds the user from the claims of the token instead of fetching it.
+    # Changes to a user only reach their tokens at the next login, so the
+    # handlers in core/signals/handlers.py revoke them when staff status or
+    # access is taken away. Tokens issued before the claims existed still
+    # load the user.
+    def get_user(self, validated_token):
+        if not all(claim in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        return StoreTokenUser(validated_token)
+
+
+class StatelessReadMixin:
+    # Authenticates the safe-method requests of a view with
+    # StatelessJWTAuthentication, for views that only need the id, the
+    # staff status and the customer id of the user.
+    def get_authenticators(self):
+        authenticators = super().get_authenticators()
+        if self.request.method not in SAFE_METHODS:
+            return authenticators
+        return [StatelessJWTAuthentication()] + [
+            authenticator for authenticator in authenticators
+            if not isinstance(authenticator, authentication.JWTAuthentication)]
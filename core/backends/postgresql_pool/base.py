@@ -0,0 +1,133 @@
+import threading
+
+import psycopg2.extras
+from psycopg2 import extensions
+from django.db.backends.postgresql import base
+
+Database = base.Database
+
+
+class ConnectionPool:
+    # At most `size` connections are checked out at once; get() waits up to
+    # `timeout` seconds for one to be put back. Idle connections are reused
+    # last in, first out, once checked, and new ones are opened on demand.
+    def __init__(self, conn_params, size, timeout):
+        self.conn_params = conn_params
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+
+    def get(self):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise Database.OperationalError(
+                f'No database connection was free within {self.timeout}s.')
+        try:
+            return self.checkout()
+        except BaseException:
+            self.slots.release()
+            raise
+
+    def checkout(self):
+        # The server may have dropped idle connections meanwhile (restart,
+        # idle timeout, failover); CONN_HEALTH_CHECKS does not apply with
+        # CONN_MAX_AGE = 0, so they are checked here.
+        while True:
+            with self.lock:
+                if not self.idle:
+                    break
+                connection = self.idle.pop()
+            if self.is_usable(connection):
+                return connection
+            connection.close()
+        return Database.connect(**self.conn_params)
+
+    def is_usable(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not connection.autocommit:
+                # Django sets the autocommit mode, outside of a transaction.
+                connection.rollback()
+        except Database.Error:
+            return False
+        return True
+
+    def put(self, connection, close=False):
+        try:
+            if close:
+                connection.close()
+            else:
+                with self.lock:
+                    self.idle.append(connection)
+        finally:
+            self.slots.release()
+
+    def close_idle(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # PostgreSQL with a pool of connections per database, shared by the
+    # threads of the process. Closing a connection, e.g. at the end of a
+    # request with CONN_MAX_AGE = 0, returns it to the pool instead of
+    # disconnecting, so requests do not pay for a new connection.
+    # OPTIONS['pool_size'] bounds the connections of a process and
+    # OPTIONS['pool_timeout'] is how long to wait for a free one.
+    pools = {}
+    pools_lock = threading.Lock()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool_size', None)
+        params.pop('pool_timeout', None)
+        return params
+
+    @property
+    def pool(self):
+        with self.pools_lock:
+            if self.alias not in self.pools:
+                options = self.settings_dict['OPTIONS']
+                self.pools[self.alias] = ConnectionPool(
+                    self.get_connection_params(),
+                    size=options.get('pool_size', 10),
+                    timeout=options.get('pool_timeout', 30),
+                )
+            return self.pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.get()
+
+        # Like the postgresql backend does for a new connection.
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get('isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            self.pool.put(self.connection, close=not self.reset())
+
+    def reset(self):
+        # Rolls back what a connection leaves behind before it goes back to
+        # the pool. Returns whether it can be reused.
+        if self.connection.closed:
+            return False
+        try:
+            status = self.connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                self.connection.rollback()
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('ibuy.requests')
+
+# `IN (%s, %s, ...)` lists are collapsed, so they count as one SQL template.
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+# Totals of the sampled requests per view, served by core.views.metrics.
+view_totals = defaultdict(Counter)
+view_totals_lock = Lock()
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.templates = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.templates[IN_LIST.sub('IN (...)', sql)] += 1
+
+    def repeated_templates(self, threshold):
+        return [template for template, count in self.templates.items()
+                if count >= threshold]
+
+
+# The recorder of the sampled request being handled. Under ASGI the ORM runs
+# in the threads of sync_to_async, each with its own connections; the context
+# is copied to them, so every connection forwards its queries to it.
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def forward_to_recorder(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_forwarder(sender, connection, **kwargs):
+    if forward_to_recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(forward_to_recorder)
+
+
+def install_forwarders():
+    # For the connections of this thread opened before this module was
+    # imported; the later ones get the forwarder when they are created.
+    for alias in connections:
+        install_forwarder(None, connections[alias])
+
+
+class RequestMetricsMiddleware:
+    # Records query count, DB time, view time and rendering (serialization)
+    # time of a sample of the requests. They are reported in the
+    # Server-Timing header, logged to `ibuy.requests` and summed per view.
+    # Unsampled requests only pay for one random() call, and a context
+    # variable lookup per query.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Marks the instance as async, like MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        self.sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0)
+        self.n_plus_one_threshold = getattr(
+            settings, 'REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', 5)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        recorder, start = QueryRecorder(), time.perf_counter()
+        with self.record_queries(request, recorder):
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        # Used under ASGI, so that async views stay on the event loop.
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        # Also on the thread that sync_to_async runs the ORM of the request in.
+        await sync_to_async(install_forwarders)()
+        recorder, start = QueryRecorder(), time.perf_counter()
+        with self.record_queries(request, recorder):
+            response = await self.get_response(request)
+        return self.finish(request, response, recorder, start)
+
+    def is_sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    @contextmanager
+    def record_queries(self, request, recorder):
+        request.metrics_render_start = None
+        install_forwarders()
+        token = current_recorder.set(recorder)
+        try:
+            yield
+        finally:
+            current_recorder.reset(token)
+
+    def finish(self, request, response, recorder, start):
+        end = time.perf_counter()
+
+        render_start = request.metrics_render_start or end
+        metrics = {
+            'db': recorder.duration * 1000,
+            'view': (render_start - start) * 1000,
+            'serialize': (end - render_start) * 1000,
+            'total': (end - start) * 1000,
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.2f}' +
+            (f';desc="{recorder.count} queries"' if name == 'db' else '')
+            for name, duration in metrics.items())
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        repeated = recorder.repeated_templates(self.n_plus_one_threshold)
+        self.record(view_name, recorder.count, metrics, bool(repeated))
+
+        log = logger.warning if repeated else logger.info
+        log(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            **{f'{name}_ms': round(duration, 2) for name, duration in metrics.items()},
+            'n_plus_one': repeated,
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the response data.
+        if hasattr(request, 'metrics_render_start'):
+            request.metrics_render_start = time.perf_counter()
+        return response
+
+    def record(self, view_name, queries, metrics, n_plus_one):
+        with view_totals_lock:
+            totals = view_totals[view_name]
+            totals['requests'] += 1
+            totals['queries'] += queries
+            totals['n_plus_one'] += n_plus_one
+            for name, duration in metrics.items():
+                totals[f'{name}_seconds'] += duration / 1000
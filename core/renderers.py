@@ -0,0 +1,30 @@
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    # Encodes with orjson, which handles dates, datetimes and UUIDs
+    # natively; Decimal and the other DRF types go through DRF's encoder.
+    # Falls back to JSONRenderer without orjson, for ASCII-only output and
+    # for indented output (e.g. the browsable API).
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.ensure_ascii or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        # Non-string keys occur in DRF errors, e.g. the indexes of the
+        # invalid items of a ListField.
+        ret = orjson.dumps(data, default=self.default,
+                           option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+        # Escaped like JSONRenderer does, to keep the output a JavaScript subset.
+        return ret.replace('\u2028'.encode(), b'\\u2028') \
+                  .replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA = 'replica'
+# Set on the responses to writes, see ReplicaReadMixin.
+PRIMARY_COOKIE = 'read_primary'
+
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def use_replica():
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    # Sends the reads made within use_replica() to the `replica` database.
+    # Everything else, writes included, uses `default`.
+    def db_for_read(self, model, **hints):
+        return REPLICA if replica_reads.get() else None
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class ReplicaReadMixin:
+    # Serves the safe-method requests of a view from the replica, when the
+    # ReplicaRouter is installed. Replicas lag behind the primary, so a
+    # write through one of these views sets a cookie that keeps the reads
+    # of its client on the primary for REPLICA_PIN_SECONDS: clients read
+    # what they just wrote. Not for the views of store/caches.py, whose
+    # cache any client may fill from a lagging replica right after a write.
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in SAFE_METHODS:
+            response = super().dispatch(request, *args, **kwargs)
+            response.set_cookie(PRIMARY_COOKIE, '1', httponly=True, samesite='Lax',
+                                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5))
+            return response
+        if PRIMARY_COOKIE in request.COOKIES:
+            return super().dispatch(request, *args, **kwargs)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
@@ -1,4 +1,12 @@
+import time
+
+from django.core.exceptions import ObjectDoesNotExist
 from djoser.serializers import UserSerializer as BaseUserSerializer
+from rest_framework_simplejwt import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import ISSUED_AT_CLAIM, is_revoked
 
 
 class UserSerializer(BaseUserSerializer):
@@ -10,3 +18,24 @@ class UserSerializer(BaseUserSerializer):
             'first_name',
             'last_name',
         ]
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    # Adds the claims StatelessJWTAuthentication builds users from.
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['is_staff'] = user.is_staff
+        try:
+            token['customer_id'] = user.customer.id
+        except ObjectDoesNotExist:
+            token['customer_id'] = None
+        token[ISSUED_AT_CLAIM] = time.time()
+        return token
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(RefreshToken(attrs['refresh'])):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from core.authentication import revoke_user_tokens
+
+# Fields whose change must not wait for the tokens of a user to expire.
+REVOKING_FIELDS = ('password', 'is_staff', 'is_active')
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_of_changed_user(sender, **kwargs):
+    user = kwargs['instance']
+    update_fields = kwargs['update_fields']
+    if user.pk is None or (update_fields is not None
+                           and not set(update_fields) & set(REVOKING_FIELDS)):
+        return
+    previous = sender.objects \
+        .filter(pk=user.pk) \
+        .values(*REVOKING_FIELDS) \
+        .first()
+    if previous and any(previous[field] != getattr(user, field) for field in REVOKING_FIELDS):
+        revoke_user_tokens(user.pk)
@@ -0,0 +1,116 @@
+import pytest
+from model_bakery import baker
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from core.authentication import get_cache
+from store.caches import get_cache as get_store_cache
+from store.models import Order, OrderItem
+
+User = get_user_model()
+
+
+def make_order(user=None):
+    customer = (user or baker.make(User)).customer
+    baker.make(OrderItem, order=baker.make(Order, customer=customer))
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # The store cache remembers the customer ids of users.
+    get_cache().clear()
+    get_store_cache().clear()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def login(api_client):
+    def do_login(is_staff=False):
+        user = User.objects.create_user(
+            'user', 'user@example.com', 'secret', is_staff=is_staff)
+        response = api_client.post('/auth/jwt/create/',
+                                   {'username': 'user', 'password': 'secret'})
+        api_client.credentials(HTTP_AUTHORIZATION=f'JWT {response.data["access"]}')
+        return user, response.data
+    return do_login
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+    def test_reads_do_not_fetch_the_user(self, api_client, login, django_assert_num_queries):
+        user, _ = login()
+        make_order(user)
+        make_order()
+
+        # Orders with customers and users, their items and the products.
+        with django_assert_num_queries(3):
+            response = api_client.get('/store/orders/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data) == 1
+
+    def test_staff_claim_is_used(self, api_client, login):
+        login(is_staff=True)
+        make_order()
+        make_order()
+
+        response = api_client.get('/store/orders/')
+
+        assert len(response.data) == 2
+
+    def test_tokens_without_claims_fetch_the_user(self, api_client, django_assert_num_queries):
+        user = baker.make(User)
+        make_order(user)
+        api_client.credentials(
+            HTTP_AUTHORIZATION=f'JWT {RefreshToken.for_user(user).access_token}')
+
+        # The user and the customer id, then the orders.
+        with django_assert_num_queries(5):
+            response = api_client.get('/store/orders/')
+
+        assert len(response.data) == 1
+
+
+@pytest.mark.django_db
+class TestRevocation:
+    def test_revoked_tokens_are_rejected(self, api_client, login):
+        _, tokens = login()
+
+        response = api_client.post('/auth/jwt/revoke/', {'refresh': tokens['refresh']})
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert api_client.get('/store/orders/').status_code == status.HTTP_401_UNAUTHORIZED
+        response = api_client.post('/auth/jwt/refresh/', {'refresh': tokens['refresh']})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_losing_staff_status_revokes_tokens(self, api_client, login):
+        user, _ = login(is_staff=True)
+
+        user.is_staff = False
+        user.save()
+
+        assert api_client.get('/store/orders/').status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_last_login_does_not_revoke_tokens(self, api_client, login):
+        user, _ = login()
+
+        user.save(update_fields=['last_login'])
+        user.first_name = 'a'
+        user.save()
+
+        assert api_client.get('/store/orders/').status_code == status.HTTP_200_OK
+
+    def test_tokens_issued_after_revocation_are_accepted(self, api_client, login):
+        user, _ = login()
+        user.set_password('secret')
+        user.save()
+
+        response = api_client.post('/auth/jwt/create/', {'username': 'user', 'password': 'secret'})
+        api_client.credentials(HTTP_AUTHORIZATION=f'JWT {response.data["access"]}')
+
+        assert api_client.get('/store/orders/').status_code == status.HTTP_200_OK
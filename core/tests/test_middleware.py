@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory
+from model_bakery import baker
+from core.middleware import RequestMetricsMiddleware, view_totals
+
+
+@pytest.fixture(autouse=True)
+def sample_every_request(settings):
+    settings.REQUEST_METRICS_SAMPLE_RATE = 1
+    view_totals.clear()
+
+
+@pytest.mark.django_db
+class TestRequestMetricsMiddleware:
+    def test_if_sampling_is_off_adds_no_header(self, client, settings):
+        settings.REQUEST_METRICS_SAMPLE_RATE = 0
+
+        response = client.get('/store/products/1/reviews/')
+
+        assert 'Server-Timing' not in response
+
+    def test_if_request_is_sampled_adds_server_timing(self, client):
+        response = client.get('/store/products/1/reviews/')
+
+        timings = [metric.split(';')[0]
+                   for metric in response['Server-Timing'].split(', ')]
+        assert timings == ['db', 'view', 'serialize', 'total']
+        assert 'desc="1 queries"' in response['Server-Timing']
+        assert view_totals['product-reviews-list']['requests'] == 1
+        assert view_totals['product-reviews-list']['queries'] == 1
+
+    def test_flags_repeated_sql_templates(self, caplog, settings):
+        settings.REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = 3
+
+        def n_plus_one_view(request):
+            for id in range(3):
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT %s', [id])
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        with caplog.at_level(logging.INFO, logger='ibuy.requests'):
+            RequestMetricsMiddleware(n_plus_one_view)(request)
+
+        assert caplog.records[0].levelno == logging.WARNING
+        assert '"n_plus_one": ["SELECT %s"]' in caplog.records[0].message
+        assert view_totals['unresolved']['n_plus_one'] == 1
+
+    def test_supports_async_handlers(self):
+        async def async_view(request):
+            return HttpResponse()
+
+        middleware = RequestMetricsMiddleware(async_view)
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        response = async_to_sync(middleware)(request)
+
+        assert 'Server-Timing' in response
+        assert view_totals['unresolved']['requests'] == 1
+
+    @pytest.mark.parametrize('urlconf', ['ibuy.urls', 'ibuy.asgi_urls'])
+    def test_counts_queries_under_asgi(self, settings, urlconf):
+        # DRF views run in a sync_to_async thread, the views of
+        # store/async_views.py use the async ORM.
+        settings.ROOT_URLCONF = urlconf
+        baker.make('store.Collection')
+
+        response = async_to_sync(AsyncClient().get)('/store/collections/')
+
+        assert response.status_code == 200
+        assert 'desc="1 queries"' in response['Server-Timing']
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_if_client_is_not_internal_returns_404(self, client):
+        response = client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+
+        assert response.status_code == 404
+
+    def test_returns_totals_per_view(self, client):
+        client.get('/store/products/1/reviews/')
+
+        response = client.get('/metrics/')
+
+        assert response.status_code == 200
+        assert 'ibuy_sampled_requests_total{view="product-reviews-list"} 1' \
+            in response.content.decode()
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.db.utils import OperationalError, load_backend
+
+pytestmark = [
+    pytest.mark.skipif(connection.vendor != 'postgresql', reason='needs PostgreSQL'),
+    pytest.mark.django_db,
+]
+
+
+DatabaseWrapper = load_backend('core.backends.postgresql_pool').DatabaseWrapper
+
+
+def connect():
+    settings = {**connection.settings_dict,
+                'OPTIONS': {'pool_size': 1, 'pool_timeout': 0.1}}
+    # Signal receivers look the alias up in `connections`.
+    return DatabaseWrapper(settings, alias=connection.alias)
+
+
+@pytest.fixture
+def pooled_connection():
+    pooled = connect()
+    yield pooled
+    pooled.close()
+    DatabaseWrapper.pools.pop(connection.alias).close_idle()
+
+
+def backend_pid(db):
+    with db.cursor() as cursor:
+        cursor.execute('SELECT pg_backend_pid()')
+        return cursor.fetchone()[0]
+
+
+class TestPooledConnection:
+    def test_closed_connection_is_reused(self, pooled_connection):
+        pid = backend_pid(pooled_connection)
+        pooled_connection.close()
+
+        assert backend_pid(pooled_connection) == pid
+
+    def test_connection_dropped_by_the_server_is_replaced(self, pooled_connection):
+        pid = backend_pid(pooled_connection)
+        pooled_connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+        assert backend_pid(pooled_connection) != pid
+
+    def test_open_transaction_is_rolled_back_on_close(self, pooled_connection):
+        pooled_connection.set_autocommit(False)
+        with pooled_connection.cursor() as cursor:
+            cursor.execute('CREATE TEMPORARY TABLE pool_test (id int)')
+        pooled_connection.close()
+
+        with pooled_connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pool_test')")
+            assert cursor.fetchone()[0] is None
+
+    def test_waits_for_a_free_connection(self, pooled_connection):
+        backend_pid(pooled_connection)
+
+        with pytest.raises(OperationalError, match='No database connection was free'):
+            backend_pid(connect())
@@ -0,0 +1,43 @@
+import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from core.renderers import FastJSONRenderer
+
+DATA = {
+    'id': uuid4(),
+    'price': Decimal('7.50'),
+    'date': datetime.date(2022, 12, 1),
+    'placed_at': datetime.datetime(2022, 12, 1, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+    'naive': datetime.datetime(2022, 12, 1, 10, 30),
+    'detail': gettext_lazy('Not found.'),
+    'text': 'café \u2028 \u2029',
+    'items': [{'quantity': 1, 'price': None}, (1, 2)],
+}
+
+
+class TestFastJSONRenderer:
+    def test_renders_like_json_renderer(self):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_renders_list_field_errors_like_json_renderer(self):
+        class Serializer(serializers.Serializer):
+            quantities = serializers.ListField(child=serializers.IntegerField())
+
+        serializer = Serializer(data={'quantities': [1, 'a']})
+        assert not serializer.is_valid()
+
+        assert FastJSONRenderer().render(serializer.errors) == \
+            JSONRenderer().render(serializer.errors)
+
+    def test_renders_none_as_empty_body(self):
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_indents_like_json_renderer(self):
+        media_type = 'application/json; indent=4'
+
+        assert FastJSONRenderer().render(DATA, media_type) == \
+            JSONRenderer().render(DATA, media_type)
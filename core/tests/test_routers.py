@@ -0,0 +1,47 @@
+import pytest
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from core.routers import PRIMARY_COOKIE, ReplicaReadMixin, ReplicaRouter, use_replica
+from store.models import Product
+
+
+class ReadDatabaseView(ReplicaReadMixin, APIView):
+    def get(self, request):
+        return Response(ReplicaRouter().db_for_read(Product))
+
+    def post(self, request):
+        return Response(ReplicaRouter().db_for_read(Product))
+
+
+class TestReplicaRouter:
+    def test_reads_use_replica_only_when_asked(self):
+        router = ReplicaRouter()
+
+        with use_replica():
+            assert router.db_for_read(Product) == 'replica'
+            assert router.db_for_write(Product) is None
+        assert router.db_for_read(Product) is None
+
+    def test_replica_is_never_migrated(self):
+        assert not ReplicaRouter().allow_migrate('replica', 'store')
+        assert ReplicaRouter().allow_migrate('default', 'store')
+
+
+class TestReplicaReadMixin:
+    @pytest.mark.parametrize('method, database', [('get', 'replica'), ('post', None)])
+    def test_only_safe_methods_read_from_replica(self, method, database):
+        request = getattr(APIRequestFactory(), method)('/')
+
+        response = ReadDatabaseView.as_view()(request)
+
+        assert response.data == database
+
+    def test_writes_keep_the_reads_of_their_client_on_primary(self):
+        response = ReadDatabaseView.as_view()(APIRequestFactory().post('/'))
+        request = APIRequestFactory().get('/')
+        request.COOKIES[PRIMARY_COOKIE] = response.cookies[PRIMARY_COOKIE].value
+
+        response = ReadDatabaseView.as_view()(request)
+
+        assert response.data is None
@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt import views
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import revoke_token
+from .middleware import view_totals, view_totals_lock
+from .serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+METRICS = [
+    ('requests', 'ibuy_sampled_requests_total', 'Sampled requests.'),
+    ('queries', 'ibuy_sampled_queries_total', 'SQL queries of the sampled requests.'),
+    ('n_plus_one', 'ibuy_sampled_n_plus_one_total', 'Sampled requests repeating an SQL template.'),
+    ('db_seconds', 'ibuy_sampled_db_seconds_total', 'Time spent in the database.'),
+    ('view_seconds', 'ibuy_sampled_view_seconds_total', 'Time spent in the view.'),
+    ('serialize_seconds', 'ibuy_sampled_serialize_seconds_total', 'Time spent rendering the response.'),
+    ('total_seconds', 'ibuy_sampled_total_seconds_total', 'Total time of the sampled requests.'),
+]
+
+
+def metrics(request):
+    # Prometheus text exposition of RequestMetricsMiddleware totals.
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS \
+            and not request.user.is_staff:
+        raise Http404
+
+    with view_totals_lock:
+        totals = {view_name: dict(counter)
+                  for view_name, counter in view_totals.items()}
+
+    lines = []
+    for key, name, help in METRICS:
+        lines.append(f'# HELP {name} {help}')
+        lines.append(f'# TYPE {name} counter')
+        for view_name, counter in sorted(totals.items()):
+            lines.append(f'{name}{{view="{view_name}"}} {counter.get(key, 0)}')
+    return HttpResponse('\n'.join(lines) + '\n',
+                        content_type='text/plain; version=0.0.4')
+
+
+class TokenObtainPairView(views.TokenObtainPairView):
+    serializer_class = TokenObtainPairSerializer
+
+
+class TokenRefreshView(views.TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
+class RevokeTokenView(APIView):
+    # Logs out: revokes the access token of the request and, when given,
+    # the refresh token it came from.
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if request.auth is not None:
+            revoke_token(request.auth)
+        if 'refresh' in request.data:
+            try:
+                revoke_token(RefreshToken(request.data['refresh']))
+            except TokenError as error:
+                raise InvalidToken(error.args[0])
+        return Response(status=status.HTTP_204_NO_CONTENT)
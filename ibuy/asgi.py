@@ -1,7 +1,20 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ibuy.settings.dev')
 
-application = get_asgi_application()
+
+class StoreASGIRequest(ASGIRequest):
+    # Adds the async read paths of the store, see ibuy/asgi_urls.py.
+    urlconf = 'ibuy.asgi_urls'
+
+
+class StoreASGIHandler(ASGIHandler):
+    request_class = StoreASGIRequest
+
+
+# Like get_asgi_application(), with the handler above.
+django.setup(set_prefix=False)
+application = StoreASGIHandler()
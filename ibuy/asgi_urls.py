@@ -0,0 +1,8 @@
+from django.urls import path, include
+from .urls import urlpatterns as wsgi_urlpatterns
+
+# The URLConf of the ASGI application: the async read paths of the store
+# come first and everything else is served like under WSGI.
+urlpatterns = [
+    path('store/', include('store.async_urls')),
+] + wsgi_urlpatterns
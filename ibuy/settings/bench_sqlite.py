@@ -0,0 +1,34 @@
+# Runs the tests and benchmarks on SQLite, without a Postgres server or the
+# local `config` module of ibuy/settings/dev.py:
+#   pytest --ds=ibuy.settings.bench_sqlite
+#   pytest -m benchmark --ds=ibuy.settings.bench_sqlite
+# store/tests/benchmarks/baseline.json is recorded with these settings.
+from .common import *
+
+SECRET_KEY = 'django-insecure-bench-sqlite'
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'bench.sqlite3',
+        # A file rather than the default in-memory test database, so that
+        # concurrent writers wait for the lock instead of failing.
+        'TEST': {'NAME': BASE_DIR / 'test_bench.sqlite3'},
+        'OPTIONS': {'timeout': 20},
+    },
+}
+
+# The toolbar would instrument every request being measured.
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE
+              if not middleware.startswith('debug_toolbar.')]
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W001']
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'core.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ),
+    'COERCE_DECIMAL_TO_STRING': False,
+}
@@ -10,6 +10,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 PROJECT_APPS = [
@@ -27,6 +28,7 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS = DJANGO_APPS + PROJECT_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -89,10 +91,55 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Product and collection responses, see store/caches.py.
+    'store': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'store',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    },
+    # Revoked JWTs, see core/authentication.py.
+    'tokens': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': None,
+    },
+}
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
 
+# Share of requests instrumented by core.middleware.RequestMetricsMiddleware.
+REQUEST_METRICS_SAMPLE_RATE = 0
+# Executions of one SQL template within a request that are flagged as N+1.
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = 5
+
+# Seconds the reads of a client stay on the primary database after it wrote
+# through a view that reads from the replica, see core/routers.py.
+REPLICA_PIN_SECONDS = 5
+
+# Carts without item changes for this long are deleted by purge_carts.
+CART_EXPIRY_DAYS = 30
+
+# Responses to POSTs with an Idempotency-Key are replayed to their retries
+# for this long, see store/idempotency.py. Purged by purge_idempotency_keys.
+IDEMPOTENCY_KEY_EXPIRY_HOURS = 24
+
+# Orders placed before the start of the month this many months ago are
+# moved to ArchivedOrder by archive_orders, see store/archive.py.
+ORDER_ARCHIVE_MONTHS = 12
+
+# Threads per process that resize uploaded product images, see
+# store/images.py. 0 resizes in the request.
+IMAGE_VARIANT_WORKERS = 2
+
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('JWT',),
 }
@@ -0,0 +1,46 @@
+# Builds the DATABASES entries of the Postgres databases.
+
+
+def postgres(name, host, user, password, port='', conn_max_age=60, pool_size=0):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'HOST': host,
+        'PORT': port,
+        'USER': user,
+        'PASSWORD': password,
+        # Connections are kept open between requests for CONN_MAX_AGE
+        # seconds, and checked before a request reuses them.
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+    }
+    if pool_size:
+        # The pool keeps connections open instead, and a connection is
+        # returned to it at the end of each request.
+        database.update({
+            'ENGINE': 'core.backends.postgresql_pool',
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {'pool_size': pool_size},
+        })
+    return database
+
+
+def postgres_from_env(environ, prefix, fallback_prefix=None):
+    # Reads <prefix>_NAME, _HOST, _PORT, _USER, _PASSWORD, _CONN_MAX_AGE and
+    # _POOL_SIZE, with missing values read from <fallback_prefix>_*, e.g.
+    # the primary's for a replica.
+    def get(key, default=''):
+        value = environ.get(f'{prefix}_{key}')
+        if value is None and fallback_prefix:
+            value = environ.get(f'{fallback_prefix}_{key}')
+        return default if value is None else value
+
+    return postgres(
+        name=get('NAME'),
+        host=get('HOST'),
+        port=get('PORT'),
+        user=get('USER'),
+        password=get('PASSWORD'),
+        conn_max_age=int(get('CONN_MAX_AGE', 60)),
+        pool_size=int(get('POOL_SIZE', 0)),
+    )
@@ -1,4 +1,5 @@
 from .common import *
+from .databases import postgres_from_env
 import os
 
 SECRET_KEY = os.environ['SECRET_KEY']
@@ -7,15 +8,68 @@ DEBUG = False
 
 ALLOWED_HOSTS = []
 
-DATABASES = {}
+DATABASES = {
+    'default': postgres_from_env(os.environ, 'DATABASE'),
+}
+
+# With a replica, the safe-method requests of the views using
+# ReplicaReadMixin read from it, except right after their client wrote,
+# see core/routers.py.
+if 'DATABASE_REPLICA_HOST' in os.environ:
+    DATABASES['replica'] = postgres_from_env(
+        os.environ, 'DATABASE_REPLICA', fallback_prefix='DATABASE')
+    DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# The toolbar never shows in production, and its middleware is sync-only:
+# under ASGI it would run every request, async views included, in a thread.
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE
+              if not middleware.startswith('debug_toolbar.')]
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W001']
+
+REQUEST_METRICS_SAMPLE_RATE = float(
+    os.environ.get('REQUEST_METRICS_SAMPLE_RATE', 0.01))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'ibuy.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Product and collection responses only carry ETags with a shared cache,
+# see store/caches.py.
+if 'REDIS_URL' in os.environ:
+    CACHES['store'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'KEY_PREFIX': 'store',
+        'TIMEOUT': 300,
+    }
+    # Every process must see the revoked tokens.
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+        'KEY_PREFIX': 'tokens',
+        'TIMEOUT': None,
+    }
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ),
     'COERCE_DECIMAL_TO_STRING': False,
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.FastJSONRenderer',
     ),
 }
@@ -2,10 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import RevokeTokenView, TokenObtainPairView, TokenRefreshView, metrics
 
 LOCAL_URLS = [
     path('admin/', admin.site.urls),
     path('store/', include('store.urls')),
+    path('metrics/', metrics),
+    # Ahead of djoser's JWT views, which they replace.
+    path('auth/jwt/create/', TokenObtainPairView.as_view(), name='jwt-create'),
+    path('auth/jwt/refresh/', TokenRefreshView.as_view(), name='jwt-refresh'),
+    path('auth/jwt/revoke/', RevokeTokenView.as_view(), name='jwt-revoke'),
 ]
 
 THIRD_PARTY_URLS = [
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connections
+
+from .models import ArchivedOrder
+
+# Orders older than ORDER_ARCHIVE_MONTHS are moved to ArchivedOrder by the
+# archive_orders command, so the order tables only hold recent orders. On
+# Postgres the archive is range partitioned by month of `placed_at`: reads
+# of a date range only visit its months, and a month can be detached or
+# dropped at once. Archived items are compressed by TOAST from 128 bytes
+# rather than the default 2kB. Other databases keep a plain table.
+
+TABLE = ArchivedOrder._meta.db_table
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def next_month(start):
+    return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+
+
+def is_partitioned(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def install_partitioning(connection):
+    # Swaps the table created by migrations for a partitioned one with the
+    # same columns and indexes. Its primary key must include `placed_at`.
+    if connection.vendor != 'postgresql' or is_partitioned(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT EXISTS (SELECT FROM {TABLE})')
+        if cursor.fetchone()[0]:
+            return
+        cursor.execute("""
+            SELECT indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexname <> %s
+        """, [TABLE, f'{TABLE}_pkey'])
+        indexes = [indexdef for indexdef, in cursor.fetchall()]
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {TABLE}_plain')
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} (LIKE {TABLE}_plain INCLUDING DEFAULTS)
+            PARTITION BY RANGE (placed_at)
+        """)
+        cursor.execute(f'DROP TABLE {TABLE}_plain')
+        cursor.execute(f'ALTER TABLE {TABLE} ADD PRIMARY KEY (id, placed_at)')
+        for indexdef in indexes:
+            cursor.execute(indexdef)
+
+
+def ensure_partitions(placed_ats, using='default'):
+    connection = connections[using]
+    if connection.vendor != 'postgresql' or not is_partitioned(connection):
+        return
+    with connection.cursor() as cursor:
+        for start in sorted({month_start(placed_at) for placed_at in placed_ats}):
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {TABLE}_{start:%Y_%m}
+                PARTITION OF {TABLE}
+                FOR VALUES FROM (%s) TO (%s)
+                WITH (toast_tuple_target = 128)
+            """, [start, next_month(start)])
+
+
+def archive(order):
+    # The order and its items, which must be prefetched with their products.
+    return ArchivedOrder(
+        id=order.id,
+        placed_at=order.placed_at,
+        customer_id=order.customer_id,
+        total=order.total,
+        items=[
+            {
+                'id': item.id,
+                'product': {
+                    'id': item.product.id,
+                    'title': item.product.title,
+                    'unit_price': str(item.product.unit_price),
+                },
+                'quantity': item.quantity,
+                'unit_price': str(item.unit_price),
+            } for item in order.items.all()
+        ],
+    )
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import async_views
+
+# URLConf
+urlpatterns = [
+    path('collections/', async_views.collection_list),
+    path('products/', async_views.product_list),
+    path('products/<pk>/', async_views.product_detail),
+    path('carts/<pk>/', async_views.cart_detail),
+]
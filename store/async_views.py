@@ -0,0 +1,190 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import views
+from .caches import (
+    aget_generation,
+    aget_token,
+    detail_key,
+    etags_enabled,
+    get_cache,
+    get_pk,
+    list_key,
+    make_etag,
+    stats,
+    version_key,
+)
+
+# Read paths for the ASGI deployment, served with the async ORM so that a
+# request does not hold a thread while it waits for the database. They are
+# routed by ibuy/asgi_urls.py only; under WSGI an async view would cost an
+# event loop per request.
+#
+# Each view builds the DRF viewset it replaces to reuse its queryset,
+# filters, pagination and serializer. Anything the async path does not
+# handle (other methods, authenticated or non-JSON requests, invalid
+# parameters, missing objects) goes to the DRF view in a thread, which
+# then produces the response, errors included.
+
+
+class Fallback(Exception):
+    pass
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def wants_json(request):
+    return 'text/html' not in request.headers.get('Accept', '*/*') \
+        and api_settings.URL_FORMAT_OVERRIDE not in request.GET
+
+
+def json_renderer():
+    return next(renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+                if renderer.format == 'json')
+
+
+def async_view(viewset, actions, read):
+    sync_view = sync_to_async(viewset.as_view(actions))
+
+    async def view(request, *args, **kwargs):
+        if request.method == 'GET' and 'Authorization' not in request.headers \
+                and wants_json(request):
+            drf_view = viewset(request=Request(request), args=args, kwargs=kwargs,
+                               format_kwarg=None, action=actions['get'])
+            try:
+                data, cache, etag = await read(drf_view)
+            except Fallback:
+                pass
+            except NotModified as not_modified:
+                return not_modified.response
+            else:
+                response = HttpResponse(json_renderer().render(data),
+                                        content_type='application/json')
+                patch_vary_headers(response, ['Accept'])
+                if cache:
+                    response['X-Cache'] = cache
+                if etag:
+                    response['ETag'] = etag
+                return response
+        return await sync_view(request, *args, **kwargs)
+
+    # The DRF views enforce CSRF themselves, like APIView.as_view().
+    view.csrf_exempt = True
+    return view
+
+
+async def cached(view, get_keys, get_data):
+    # CachedResponseMixin, for the viewsets that use it.
+    namespace = getattr(view, 'cache_namespace', None)
+    if namespace is None:
+        return await get_data(view), None, None
+
+    key, version = await get_keys(namespace)
+    etag = None
+    if etags_enabled():
+        etag = make_etag(key, version, 'json', view.request.get_host())
+        not_modified = get_conditional_response(view.request, etag=etag)
+        if not_modified is not None:
+            stats[f'{namespace}.not_modified'] += 1
+            not_modified['ETag'] = etag
+            raise NotModified(not_modified)
+
+    cache = get_cache()
+    data = await cache.aget(key)
+    if data is not None:
+        stats[f'{namespace}.hit'] += 1
+        return data, 'HIT', etag
+
+    data = await get_data(view)
+    stats[f'{namespace}.miss'] += 1
+    await cache.aset(key, data)
+    return data, 'MISS', etag
+
+
+async def filtered_queryset(view):
+    queryset = view.get_queryset()
+    if not view.request.query_params:
+        return queryset
+    # Filters may query the database while validating, e.g. the
+    # ModelChoiceFilter of `collection_id`.
+    try:
+        return await sync_to_async(view.filter_queryset)(queryset)
+    except ValidationError:
+        raise Fallback
+
+
+async def list_data(view):
+    queryset = await filtered_queryset(view)
+
+    pagination = view.paginator
+    if pagination is None:
+        objects = [obj async for obj in queryset]
+        return view.get_serializer(objects, many=True).data
+
+    # PageNumberPagination.paginate_queryset(), with the COUNT(*) and the
+    # page fetched through the async ORM.
+    request = view.request
+    paginator = pagination.django_paginator_class(
+        queryset, pagination.get_page_size(request))
+    paginator.count = await queryset.acount()
+    try:
+        page = paginator.page(pagination.get_page_number(request, paginator))
+    except InvalidPage:
+        raise Fallback
+    page.object_list = [obj async for obj in page.object_list]
+    pagination.page, pagination.request = page, request
+    serializer = view.get_serializer(page.object_list, many=True)
+    return pagination.get_paginated_response(serializer.data).data
+
+
+async def retrieve_data(view):
+    lookup = view.kwargs[view.lookup_url_kwarg or view.lookup_field]
+    try:
+        queryset = await filtered_queryset(view)
+        instance = await queryset.aget(**{view.lookup_field: lookup})
+    except (ObjectDoesNotExist, DjangoValidationError, TypeError, ValueError):
+        raise Fallback
+    return view.get_serializer(instance).data
+
+
+async def read_list(view):
+    if view.paginator is not None and \
+            not isinstance(view.paginator, views.DefaultPagination):
+        raise Fallback
+
+    async def get_keys(namespace):
+        generation = await aget_generation(namespace)
+        return list_key(namespace, generation, view.request), generation
+
+    return await cached(view, get_keys, list_data)
+
+
+async def read_detail(view):
+    async def get_keys(namespace):
+        pk = get_pk(view)
+        if pk is None:
+            raise Fallback
+        return detail_key(namespace, pk), await aget_token(version_key(namespace, pk))
+
+    return await cached(view, get_keys, retrieve_data)
+
+
+product_list = async_view(
+    views.ProductViewSet, {'get': 'list', 'post': 'create'}, read_list)
+product_detail = async_view(
+    views.ProductViewSet,
+    {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'},
+    read_detail)
+collection_list = async_view(
+    views.CollectionViewSet, {'get': 'list', 'post': 'create'}, read_list)
+cart_detail = async_view(
+    views.CartViewSet, {'get': 'retrieve', 'delete': 'destroy'}, read_detail)
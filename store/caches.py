@@ -0,0 +1,166 @@
+from collections import Counter
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'store'
+
+# Per-process hit/miss counters, keyed like 'products.hit'.
+stats = Counter()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_token(key):
+    # Tokens are random rather than counters so an evicted token can never
+    # resurrect stale data.
+    cache = get_cache()
+    token = cache.get(key)
+    if token is None:
+        token = uuid4().hex
+        if not cache.add(key, token, timeout=None):
+            token = cache.get(key, token)
+    return token
+
+
+async def aget_token(key):
+    # get_token() for the async views, see store/async_views.py.
+    cache = get_cache()
+    token = await cache.aget(key)
+    if token is None:
+        token = uuid4().hex
+        if not await cache.aadd(key, token, timeout=None):
+            token = await cache.aget(key, token)
+    return token
+
+
+def get_generation(namespace):
+    # A list key embeds the namespace generation, so bumping it invalidates
+    # every cached page at once.
+    return get_token(f'{namespace}:generation')
+
+
+async def aget_generation(namespace):
+    return await aget_token(f'{namespace}:generation')
+
+
+def version_key(namespace, pk):
+    # Changes with every write to the object, like the generation of lists.
+    return f'{namespace}:version:{pk}'
+
+
+def list_key(namespace, generation, request):
+    # The pages hold absolute `next` and `previous` links, so the scheme and
+    # host are part of the key.
+    query = request.query_params.urlencode()
+    params = '&'.join(sorted(query.split('&'))) if query else ''
+    return f'{namespace}:list:{generation}:{request.build_absolute_uri("/")}:{params}'
+
+
+def detail_key(namespace, pk):
+    return f'{namespace}:detail:{pk}'
+
+
+def get_pk(view):
+    # The pk of the URL as the writes see it, e.g. 1 for '/products/01/', or
+    # None when it is not a valid pk.
+    pk = view.kwargs[view.lookup_url_kwarg or view.lookup_field]
+    try:
+        return view.get_queryset().model._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+
+
+def invalidate_list(namespace):
+    get_cache().set(f'{namespace}:generation', uuid4().hex, timeout=None)
+
+
+def invalidate_detail(namespace, pk):
+    get_cache().delete_many([detail_key(namespace, pk), version_key(namespace, pk)])
+
+
+def invalidate_products(product_ids):
+    # For bulk updates of products, which do not send signals.
+    invalidate_list('products')
+    get_cache().delete_many(
+        [key for product_id in product_ids
+         for key in (detail_key('products', product_id), version_key('products', product_id))])
+
+
+def etags_enabled():
+    # The tokens of a local-memory cache only change in the process that
+    # handled the write, and never expire: the other processes would answer
+    # 304 for changed data indefinitely. Their cached data at least expires.
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def make_etag(key, version, format, host):
+    # The cache key and token identify the data without reading it; the
+    # format and host are part of the rendered response.
+    parts = f'{key}|{version}|{format}|{host}'
+    return quote_etag(md5(parts.encode(), usedforsecurity=False).hexdigest())
+
+
+class CachedResponseMixin:
+    # Caches the data of list and retrieve responses in the `store` cache.
+    # Writes invalidate it through the handlers in store/signals/handlers.py.
+    cache_namespace = None
+
+    # When the cache is shared between processes, responses carry an ETag
+    # derived from the same generation and version tokens, and a matching
+    # If-None-Match gets a 304 before the cache or the database are read.
+    def list(self, request, *args, **kwargs):
+        generation = get_generation(self.cache_namespace)
+        key = list_key(self.cache_namespace, generation, request)
+        return self.get_cached_response(
+            key, generation,
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = get_pk(self)
+        if pk is None:
+            return super().retrieve(request, *args, **kwargs)
+        version = get_token(version_key(self.cache_namespace, pk))
+        return self.get_cached_response(
+            detail_key(self.cache_namespace, pk), version,
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+    def get_cached_response(self, key, version, get_response):
+        if not etags_enabled():
+            return self.get_data_response(key, get_response)
+
+        etag = make_etag(key, version, self.request.accepted_renderer.format,
+                         self.request.get_host())
+        not_modified = get_conditional_response(self.request, etag=etag)
+        if not_modified is not None:
+            stats[f'{self.cache_namespace}.not_modified'] += 1
+            not_modified['ETag'] = etag
+            return not_modified
+
+        response = self.get_data_response(key, get_response)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+    def get_data_response(self, key, get_response):
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            stats[f'{self.cache_namespace}.hit'] += 1
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        stats[f'{self.cache_namespace}.miss'] += 1
+        response = get_response()
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
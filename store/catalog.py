@@ -0,0 +1,49 @@
+import csv
+import json
+from contextlib import contextmanager
+
+# Columns of the catalog files read by import_products and written by
+# export_products. `collection` holds the collection title.
+COLUMNS = ['title', 'description', 'inventory', 'unit_price', 'collection']
+FORMATS = ['csv', 'jsonl']
+
+
+def guess_format(path, format=None):
+    if format:
+        return format
+    if path.endswith('.jsonl'):
+        return 'jsonl'
+    return 'csv'
+
+
+@contextmanager
+def open_catalog(path, mode, stream):
+    if path == '-':
+        yield stream
+        return
+    with open(path, mode, newline='', encoding='utf-8') as file:
+        yield file
+
+
+def read_rows(file, format):
+    if format == 'jsonl':
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from csv.DictReader(file)
+
+
+class RowWriter:
+    def __init__(self, file, format):
+        self.file = file
+        self.format = format
+        if format == 'csv':
+            self.writer = csv.writer(file)
+            self.writer.writerow(COLUMNS)
+
+    def write(self, row):
+        if self.format == 'jsonl':
+            self.file.write(json.dumps(dict(zip(COLUMNS, row))) + '\n')
+        else:
+            self.writer.writerow(row)
@@ -0,0 +1,49 @@
+from .caches import get_cache
+from .models import Customer
+
+# Maps users to their customer id, so that authenticated requests do not
+# query the customer table to find out whose orders they are about. The id
+# is remembered on the request, and across requests in the `store` cache,
+# which the handlers in store/signals/handlers.py keep up to date. With a
+# local-memory cache they only reach the process that saved the customer,
+# so the ids expire with the cache TIMEOUT instead of staying for good.
+
+
+def customer_key(user_id):
+    return f'customers:user:{user_id}'
+
+
+def get_customer_id(request):
+    if not hasattr(request, 'customer_id'):
+        # Users authenticated by StatelessJWTAuthentication carry it.
+        request.customer_id = getattr(request.user, 'customer_id', None) \
+            or resolve_customer_id(request.user.pk)
+    return request.customer_id
+
+
+def get_customer(request):
+    # For views that need the customer itself, which is one query anyway.
+    customer = Customer.objects.get(user_id=request.user.pk)
+    if getattr(request, 'customer_id', None) != customer.id:
+        request.customer_id = customer.id
+        get_cache().set(customer_key(request.user.pk), customer.id)
+    return customer
+
+
+def resolve_customer_id(user_id):
+    cache = get_cache()
+    key = customer_key(user_id)
+    customer_id = cache.get(key)
+    if customer_id is None:
+        customer_id = Customer.objects \
+                              .filter(user_id=user_id) \
+                              .values_list('id', flat=True) \
+                              .first()
+        if customer_id is None:
+            raise Customer.DoesNotExist('The user has no customer.')
+        cache.set(key, customer_id)
+    return customer_id
+
+
+def forget_customer(*user_ids):
+    get_cache().delete_many([customer_key(user_id) for user_id in user_ids])
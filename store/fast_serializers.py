@@ -0,0 +1,164 @@
+from decimal import Decimal
+
+from rest_framework import serializers
+
+from .images import variant_urls
+
+# Read-only replacements for the nested ModelSerializers of the hot read
+# endpoints. They produce the same data, but read attributes directly
+# instead of going through the per-field machinery of DRF. Fields with
+# formatting rules (decimals, dates) reuse one shared DRF field each.
+# Keep them in sync with the serializers in store/serializers.py; the
+# parity tests in store/tests/test_fast_serializers.py enforce it.
+
+price_field = serializers.DecimalField(max_digits=6, decimal_places=2)
+total_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+rating_field = serializers.DecimalField(max_digits=3, decimal_places=2)
+date_field = serializers.DateField()
+datetime_field = serializers.DateTimeField()
+
+
+def price(value):
+    return None if value is None else price_field.to_representation(value)
+
+
+def rating(value):
+    return None if value is None else rating_field.to_representation(value)
+
+
+def date(value):
+    return date_field.to_representation(value) if value else None
+
+
+def image_url(image, request):
+    if not image:
+        return None
+    url = image.url
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def simple_product(product):
+    return {
+        'id': product.id,
+        'title': product.title,
+        'unit_price': price(product.unit_price),
+    }
+
+
+class FastSerializer:
+    # Subclasses define to_representation(), like DRF serializers.
+    def __init__(self, instance=None, many=False, context=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+
+    @property
+    def data(self):
+        if self.many:
+            return [self.to_representation(obj) for obj in self.instance]
+        return self.to_representation(self.instance)
+
+
+class FastProductSerializer(FastSerializer):
+    # Mirrors ProductSerializer.
+    def to_representation(self, product):
+        request = self.context.get('request')
+        return {
+            'id': product.id,
+            'title': product.title,
+            'description': product.description,
+            'inventory': product.inventory,
+            'last_update': date(product.last_update),
+            'unit_price': price(product.unit_price),
+            'collection_id': product.collection_id,
+            'reviews_count': product.reviews_count,
+            'average_rating': rating(product.average_rating),
+            'last_review_date': date(product.last_review_date),
+            'images': [
+                {
+                    'id': image.id,
+                    'image': image_url(image.image, request),
+                    'variants': variant_urls(image, request),
+                }
+                for image in product.images.all()
+            ],
+        }
+
+
+class FastCartSerializer(FastSerializer):
+    # Mirrors CartSerializer.
+    def to_representation(self, cart):
+        items = []
+        total_price = 0
+        for item in cart.items.all():
+            item_price = item.quantity * item.product.unit_price
+            total_price += item_price
+            items.append({
+                'id': item.id,
+                'product': simple_product(item.product),
+                'quantity': item.quantity,
+                'total_price': item_price,
+            })
+        return {
+            'id': str(cart.id),
+            'items': items,
+            'total_price': total_price,
+        }
+
+
+def customer_data(customer):
+    user = customer.user
+    return {
+        'id': customer.id,
+        'phone': customer.phone,
+        'birth_date': date(customer.birth_date),
+        'user': {
+            'id': user.id,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+        },
+    }
+
+
+class FastOrderSerializer(FastSerializer):
+    # Mirrors OrderSerializer.
+    def to_representation(self, order):
+        return {
+            'id': order.id,
+            'placed_at': datetime_field.to_representation(order.placed_at),
+            'customer': customer_data(order.customer),
+            'items': [
+                {
+                    'id': item.id,
+                    'product': simple_product(item.product),
+                    'quantity': item.quantity,
+                    'unit_price': price(item.unit_price),
+                } for item in order.items.all()
+            ],
+            'invoice_amount': total_field.to_representation(order.total),
+        }
+
+
+class FastArchivedOrderSerializer(FastSerializer):
+    # Renders an ArchivedOrder like OrderSerializer renders an Order, with
+    # the product prices of when it was archived.
+    def to_representation(self, order):
+        return {
+            'id': order.id,
+            'placed_at': datetime_field.to_representation(order.placed_at),
+            'customer': customer_data(order.customer),
+            'items': [
+                {
+                    'id': item['id'],
+                    'product': {
+                        'id': item['product']['id'],
+                        'title': item['product']['title'],
+                        'unit_price': price(Decimal(item['product']['unit_price'])),
+                    },
+                    'quantity': item['quantity'],
+                    'unit_price': price(Decimal(item['unit_price'])),
+                } for item in order.items
+            ],
+            'invoice_amount': total_field.to_representation(order.total),
+        }
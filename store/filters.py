@@ -1,11 +1,57 @@
-from django_filters.rest_framework import FilterSet
-from .models import Product
+from django.db import connections
+from django.db.models import F, Q
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django_filters.rest_framework import BooleanFilter, FilterSet
+from rest_framework.filters import SearchFilter
+from .models import ArchivedOrder, Order, Product
 
 
 class ProductFilter(FilterSet):
+    in_stock = BooleanFilter(method='filter_in_stock')
+
     class Meta:
         model = Product
         fields = {
             'collection_id': ['exact'],
             'unit_price': ['gt', 'lt'],
         }
+
+    def filter_in_stock(self, queryset, name, value):
+        # `inventory > 0` as written in the store_product_in_stock_idx
+        # condition, so Postgres can use the partial index.
+        if value:
+            return queryset.filter(inventory__gt=0)
+        return queryset.filter(inventory=0)
+
+
+class OrderFilter(FilterSet):
+    class Meta:
+        model = Order
+        fields = {
+            'placed_at': ['gte', 'lt'],
+        }
+
+
+class ArchivedOrderFilter(FilterSet):
+    class Meta:
+        model = ArchivedOrder
+        fields = OrderFilter.Meta.fields
+
+
+class ProductSearchFilter(SearchFilter):
+    # Ranked full-text search on Postgres, with trigram similarity on the
+    # title to catch typos. Other databases fall back to `icontains`.
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        if connections[queryset.db].vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        terms = ' '.join(search_terms)
+        query = SearchQuery(terms, config='english', search_type='websearch')
+        return queryset \
+            .annotate(rank=SearchRank(F('search_vector'), query),
+                      similarity=TrigramSimilarity('title', terms)) \
+            .filter(Q(search_vector=query) | Q(title__trigram_similar=terms)) \
+            .order_by('-rank', '-similarity', 'id')
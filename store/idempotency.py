@@ -0,0 +1,84 @@
+from datetime import timedelta
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.renderers import FastJSONRenderer
+
+from .models import IdempotentRequest
+
+# A POST sent with an Idempotency-Key header is run at most once per user,
+# or per URL for anonymous clients, and key. Its successful response is
+# stored with the key and replayed to retries for IDEMPOTENCY_KEY_EXPIRY_HOURS.
+# The key is claimed in the transaction of the request, so a retry sent while
+# the request is still running waits for it on the unique constraint, then
+# replays its response. Failed requests release the key.
+
+HEADER = 'Idempotency-Key'
+
+
+def get_expiry():
+    return timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_EXPIRY_HOURS', 24))
+
+
+def idempotent(create):
+    @wraps(create)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return create(self, request, *args, **kwargs)
+        if not 0 < len(key) <= IdempotentRequest._meta.get_field('key').max_length:
+            return Response({'detail': f'{HEADER} must have 1 to 255 characters.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        scope = f'user:{request.user.pk}' if request.user.is_authenticated else request.path
+        fingerprint = md5(
+            b'\n'.join([request.method.encode(), request.path.encode(), request.body]),
+            usedforsecurity=False).hexdigest()
+
+        with transaction.atomic():
+            stored = claim(scope, key, fingerprint)
+            if stored is not None:
+                return replay(stored, fingerprint)
+            response = create(self, request, *args, **kwargs)
+            if status.is_success(response.status_code):
+                IdempotentRequest.objects \
+                                 .filter(scope=scope, key=key) \
+                                 .update(status=response.status_code,
+                                         content=FastJSONRenderer().render(response.data))
+            else:
+                IdempotentRequest.objects.filter(scope=scope, key=key).delete()
+            return response
+    return wrapper
+
+
+def claim(scope, key, fingerprint):
+    # Returns the stored request of the key, or None once it is claimed.
+    try:
+        with transaction.atomic():
+            IdempotentRequest.objects.create(scope=scope, key=key, fingerprint=fingerprint)
+        return None
+    except IntegrityError:
+        stored = IdempotentRequest.objects.get(scope=scope, key=key)
+    if stored.created_at < timezone.now() - get_expiry():
+        # Expired, but not purged yet.
+        stored.delete()
+        return claim(scope, key, fingerprint)
+    return stored
+
+
+def replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return Response(
+            {'detail': f'{HEADER} was already used for another request.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    response = HttpResponse(
+        bytes(stored.content), status=stored.status, content_type='application/json')
+    response['Idempotent-Replayed'] = 'true'
+    return response
@@ -0,0 +1,148 @@
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps
+
+from .caches import invalidate_products
+from .models import ProductImage
+
+# Resized copies of product images, generated after the upload has been
+# saved so that decoding a large original never holds up the request.
+# Uploads are resized by a pool of threads in the web process; Pillow
+# releases the GIL while it decodes, resizes and encodes. Images whose
+# variants are still empty (e.g. the process stopped before their turn)
+# are picked up by the generate_image_variants command. Variants replaced by
+# new ones, or of deleted images, are deleted from the storage.
+
+logger = logging.getLogger('ibuy.images')
+
+# Longest side in pixels.
+VARIANTS = {
+    'thumbnail': 160,
+    'medium': 640,
+}
+
+# Variant format: Pillow format, file extension.
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg'),
+    'webp': ('WEBP', 'webp'),
+}
+
+VARIANTS_DIR = 'store/images/variants'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS,
+                thread_name_prefix='image-variants')
+        return _executor
+
+
+def encode(image, format):
+    if format == 'jpeg':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, FORMATS[format][0], quality=80)
+    return buffer.getvalue()
+
+
+def resize(file):
+    # Yields (variant, format, bytes) for every variant of an image file.
+    with Image.open(file) as original:
+        # Lets JPEG decode at a fraction of the size when it is much larger
+        # than the largest variant.
+        largest = max(VARIANTS.values())
+        original.draft('RGB', (largest, largest))
+        original = ImageOps.exif_transpose(original)
+        for variant, size in VARIANTS.items():
+            image = original.copy()
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            for format in FORMATS:
+                yield variant, format, encode(image, format)
+
+
+def generate_variants(image_id):
+    image = ProductImage.objects.filter(pk=image_id).first()
+    if image is None:
+        return None
+
+    storage = image.image.storage
+    stem = os.path.splitext(os.path.basename(image.image.name))[0]
+    variants = {}
+    with image.image.open('rb') as file:
+        for variant, format, content in resize(file):
+            name = f'{VARIANTS_DIR}/{stem}_{variant}.{FORMATS[format][1]}'
+            variants.setdefault(variant, {})[format] = \
+                storage.save(name, ContentFile(content))
+
+    # An update() does not send post_save, so this does not enqueue the
+    # image again.
+    if not ProductImage.objects.filter(pk=image_id).update(variants=variants):
+        # Deleted while it was being resized.
+        delete_files(storage, variant_names(variants))
+        return None
+    invalidate_products([image.product_id])
+    # E.g. with generate_image_variants --all.
+    discard_variants(image, image.variants)
+    return variants
+
+
+def variant_names(variants):
+    return [name for formats in variants.values() for name in formats.values()]
+
+
+def delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+def discard_variants(image, variants):
+    # Deletes the files of variants the image no longer uses, once that is
+    # committed.
+    storage = image.image.storage
+    names = variant_names(variants)
+    if names:
+        transaction.on_commit(lambda: delete_files(storage, names))
+
+
+def run(image_id):
+    try:
+        generate_variants(image_id)
+    except Exception:
+        logger.exception('Could not generate the variants of product image %s.', image_id)
+    finally:
+        # Worker threads have connections of their own.
+        connections.close_all()
+
+
+def enqueue_variants(image_id):
+    # Runs once the upload is committed, so the worker can read it.
+    # IMAGE_VARIANT_WORKERS = 0 resizes in the request instead, e.g. for
+    # tests.
+    if settings.IMAGE_VARIANT_WORKERS:
+        transaction.on_commit(lambda: get_executor().submit(run, image_id))
+    else:
+        transaction.on_commit(lambda: generate_variants(image_id))
+
+
+def variant_urls(image, request):
+    storage = image.image.storage
+    build = request.build_absolute_uri if request is not None else str
+    return {
+        variant: {format: build(storage.url(name)) for format, name in formats.items()}
+        for variant, formats in image.variants.items()
+    }
@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from store.archive import archive, ensure_partitions, month_start
+from store.models import ArchivedOrder, Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Moves orders older than ORDER_ARCHIVE_MONTHS to the archive, in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int,
+                            default=getattr(settings, 'ORDER_ARCHIVE_MONTHS', 12))
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        # Whole months are archived, so that a month is never split between
+        # the order tables and its archive partition.
+        start = month_start(timezone.now())
+        months = start.year * 12 + start.month - 1 - options['months']
+        cutoff = start.replace(year=months // 12, month=months % 12 + 1)
+        batch_size = options['batch_size']
+
+        orders = items = 0
+        timings = []
+        while True:
+            start = time.perf_counter()
+            archived_orders, archived_items = self.archive_batch(cutoff, batch_size)
+            if not archived_orders:
+                break
+            timings.append((time.perf_counter() - start) * 1000)
+            orders += archived_orders
+            items += archived_items
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'Batch {len(timings)}: {archived_orders} order(s), '
+                    f'{archived_items} item(s) in {timings[-1]:.1f}ms')
+
+        average = sum(timings) / len(timings) if timings else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {orders} order(s) and {items} item(s) placed before '
+            f'{cutoff:%Y-%m-%d} in {len(timings)} batch(es), {average:.1f}ms '
+            f'per batch (max {max(timings, default=0):.1f}ms).'))
+
+    @transaction.atomic()
+    def archive_batch(self, cutoff, batch_size):
+        # The orders are copied and deleted in one transaction, so an order
+        # is either in the order tables or in the archive.
+        order_ids = list(Order.objects
+                              .filter(placed_at__lt=cutoff)
+                              .order_by('placed_at')
+                              .select_for_update(skip_locked=True)
+                              .values_list('id', flat=True)[:batch_size])
+        if not order_ids:
+            return 0, 0
+        orders = Order.objects \
+                      .filter(pk__in=order_ids) \
+                      .prefetch_related('items__product')
+        ensure_partitions([order.placed_at for order in orders])
+        ArchivedOrder.objects.bulk_create([archive(order) for order in orders])
+        # Items protect their orders, so they go first.
+        items = OrderItem.objects.filter(order_id__in=order_ids).delete()[0]
+        Order.objects.filter(pk__in=order_ids).delete()
+        return len(order_ids), items
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.catalog import FORMATS, RowWriter, guess_format, open_catalog
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Writes every product to a CSV or JSONL file that import_products can read.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-',
+                            help="CSV or JSONL file, or '-' for stdout (default).")
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = guess_format(path, options['format'])
+
+        # iterator() reads through a server-side cursor on Postgres, so the
+        # catalog is never loaded at once.
+        rows = Product.objects \
+                      .order_by('id') \
+                      .values_list('title', 'description', 'inventory',
+                                   'unit_price', 'collection__title') \
+                      .iterator(chunk_size=options['batch_size'])
+
+        start = time.perf_counter()
+        exported = 0
+        with open_catalog(path, 'w', self.stdout) as file:
+            writer = RowWriter(file, format)
+            for title, description, inventory, unit_price, collection in rows:
+                writer.write([title, description, inventory, str(unit_price), collection])
+                exported += 1
+
+        elapsed = time.perf_counter() - start
+        # The report must not end up in the exported data.
+        report = self.stderr if path == '-' else self.stdout
+        report.write(self.style.SUCCESS(
+            f'Exported {exported} product(s) in {elapsed:.2f}s '
+            f'({exported / max(elapsed, 1e-9):.0f} rows/s).'))
@@ -0,0 +1,36 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from store.images import generate_variants, run
+from store.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Resizes the product images that have no variants yet, e.g. after a restart.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Images resized at once; 0 resizes them one by one.')
+        parser.add_argument('--all', action='store_true',
+                            help='Regenerate the variants of every image, e.g. after '
+                                 'changing their sizes.')
+
+    def handle(self, *args, **options):
+        images = ProductImage.objects.order_by('id')
+        if not options['all']:
+            images = images.filter(variants={})
+        image_ids = list(images.values_list('id', flat=True))
+
+        start = time.perf_counter()
+        if options['workers']:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                list(executor.map(run, image_ids))
+        else:
+            for image_id in image_ids:
+                generate_variants(image_id)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Resized {len(image_ids)} image(s) in {elapsed:.2f}s.'))
@@ -0,0 +1,98 @@
+import sys
+import time
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from store.caches import invalidate_products
+from store.catalog import FORMATS, guess_format, open_catalog, read_rows
+from store.models import Collection, Product
+
+UPDATE_FIELDS = ['description', 'inventory', 'unit_price', 'collection_id', 'last_update']
+
+
+class Command(BaseCommand):
+    help = 'Creates or updates products, matched by title, from a CSV or JSONL file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or '-' for stdin.")
+        parser.add_argument('--format', choices=FORMATS,
+                            help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--atomic', action='store_true',
+                            help='Import the whole file or nothing. Otherwise each batch '
+                                 'is committed on its own, so that its rows are not '
+                                 'locked for the length of the import.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = guess_format(path, options['format'])
+        batch_size = options['batch_size']
+        collection_ids = dict(Collection.objects.values_list('title', 'id'))
+
+        start = time.perf_counter()
+        imported = merged = 0
+        try:
+            with open_catalog(path, 'r', sys.stdin) as file, \
+                    transaction.atomic() if options['atomic'] else nullcontext():
+                rows = enumerate(read_rows(file, format), start=1)
+                while batch := list(islice(rows, batch_size)):
+                    # The last row of a title wins; Postgres refuses to upsert
+                    # the same row twice in one statement.
+                    products = {}
+                    for number, row in batch:
+                        product = self.build_product(number, row, collection_ids)
+                        products[product.title] = product
+
+                    self.import_batch(products)
+                    imported += len(products)
+                    merged += len(batch) - len(products)
+        finally:
+            # Also after a failure, for the batches already committed.
+            call_command('reconcile_products_count', stdout=self.stdout)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} product(s), merging {merged} row(s) with a '
+            f'duplicate title, in {elapsed:.2f}s '
+            f'({(imported + merged) / max(elapsed, 1e-9):.0f} rows/s).'))
+
+    @transaction.atomic()
+    def import_batch(self, products):
+        # Checkout reserves inventory with UPDATEs of the same rows, which
+        # wait for the batch to commit.
+        Product.objects.bulk_create(
+            products.values(),
+            update_conflicts=True,
+            unique_fields=['title'],
+            update_fields=UPDATE_FIELDS,
+        )
+        # bulk_create() sends no signals, so the caches are invalidated here
+        # and the counts reconciled by handle().
+        product_ids = list(Product.objects
+                                  .filter(title__in=products)
+                                  .values_list('id', flat=True))
+        transaction.on_commit(partial(invalidate_products, product_ids))
+
+    def build_product(self, number, row, collection_ids):
+        collection = row.get('collection')
+        if collection not in collection_ids:
+            raise CommandError(f'Row {number}: unknown collection {collection!r}.')
+
+        values = {}
+        for name in ['title', 'description', 'inventory', 'unit_price']:
+            field = Product._meta.get_field(name)
+            value = row.get(name)
+            if value is None and field.blank:
+                value = ''
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as error:
+                raise CommandError(f'Row {number}: {name}: {" ".join(error.messages)}')
+
+        return Product(collection_id=collection_ids[collection], **values)
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import Cart
+
+
+class Command(BaseCommand):
+    help = 'Deletes carts without item changes for CART_EXPIRY_DAYS, in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=getattr(settings, 'CART_EXPIRY_DAYS', 30))
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+
+        carts = items = 0
+        timings = []
+        while True:
+            start = time.perf_counter()
+            deleted_carts, deleted_items = self.purge_batch(cutoff, batch_size)
+            if not deleted_carts:
+                break
+            timings.append((time.perf_counter() - start) * 1000)
+            carts += deleted_carts
+            items += deleted_items
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'Batch {len(timings)}: {deleted_carts} cart(s), '
+                    f'{deleted_items} item(s) in {timings[-1]:.1f}ms')
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        average = sum(timings) / len(timings) if timings else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {carts} cart(s) and {items} item(s) in {len(timings)} '
+            f'batch(es), {average:.1f}ms per batch (max {max(timings, default=0):.1f}ms).'))
+
+    @transaction.atomic()
+    def purge_batch(self, cutoff, batch_size):
+        # Each batch locks at most batch_size carts, and only until its
+        # transaction commits. Carts locked by a request are skipped, and
+        # locked carts cannot be touched before they are deleted.
+        cart_ids = list(Cart.objects
+                            .filter(last_activity__lt=cutoff)
+                            .order_by('last_activity')
+                            .select_for_update(skip_locked=True)
+                            .values_list('id', flat=True)[:batch_size])
+        if not cart_ids:
+            return 0, 0
+        # The items are deleted by one cascading DELETE ... WHERE cart_id IN.
+        deleted = Cart.objects.filter(pk__in=cart_ids).delete()[1]
+        return deleted.get('store.Cart', 0), deleted.get('store.CartItem', 0)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from store.idempotency import get_expiry
+from store.models import IdempotentRequest
+
+
+class Command(BaseCommand):
+    help = 'Deletes the stored responses of expired idempotency keys, in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - get_expiry()
+
+        deleted = batches = 0
+        while True:
+            ids = list(IdempotentRequest.objects
+                                        .filter(created_at__lt=cutoff)
+                                        .values_list('id', flat=True)[:options['batch_size']])
+            if not ids:
+                break
+            deleted += IdempotentRequest.objects.filter(pk__in=ids).delete()[0]
+            batches += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Purged {deleted} idempotency key(s) in {batches} batch(es).'))
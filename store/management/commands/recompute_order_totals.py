@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from store.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Order.total from the order items, e.g. for orders placed before it existed.'
+
+    def handle(self, *args, **options):
+        total = Coalesce(Subquery(
+            OrderItem.objects
+                     .filter(order_id=OuterRef('pk'))
+                     .values('order_id')
+                     .annotate(total=Sum(F('quantity') * F('unit_price')))
+                     .values('total'),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        ), 0, output_field=DecimalField(max_digits=10, decimal_places=2))
+
+        updated = Order.objects.update(total=total)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed the total of {updated} order(s).'))
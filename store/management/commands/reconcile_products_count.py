@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from store.caches import invalidate_detail, invalidate_list
+from store.models import Collection, Product
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Collection.products_count for collections that drifted.'
+
+    def handle(self, *args, **options):
+        actual_count = Coalesce(Subquery(
+            Product.objects
+                   .filter(collection_id=OuterRef('pk'))
+                   .values('collection_id')
+                   .annotate(count=Count('id'))
+                   .values('count')
+        ), 0)
+
+        drifted_ids = list(Collection.objects
+                                     .annotate(actual_count=actual_count)
+                                     .exclude(products_count=F('actual_count'))
+                                     .values_list('pk', flat=True))
+        updated = Collection.objects \
+                            .filter(pk__in=drifted_ids) \
+                            .update(products_count=actual_count)
+
+        invalidate_list('collections')
+        for collection_id in drifted_ids:
+            invalidate_detail('collections', collection_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled products_count of {updated} collection(s).'))
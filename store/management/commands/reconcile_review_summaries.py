@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from store.caches import invalidate_products
+from store.models import Product, Review
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the review summary of products that drifted.'
+
+    def handle(self, *args, **options):
+        def actual(aggregate):
+            return Subquery(
+                Review.objects
+                      .filter(product_id=OuterRef('pk'))
+                      .values('product_id')
+                      .annotate(value=aggregate)
+                      .values('value'))
+
+        summary = {
+            'reviews_count': Coalesce(actual(Count('id')), 0),
+            'ratings_count': Coalesce(actual(Count('rating')), 0),
+            'ratings_total': Coalesce(actual(Sum('rating')), 0),
+            'last_review_date': actual(Max('date')),
+        }
+
+        # Dates are compared with a placeholder for NULL, which never equals.
+        no_date = Value(date.min)
+        drifted_ids = list(Product.objects
+                                  .annotate(actual_reviews_count=summary['reviews_count'],
+                                            actual_ratings_count=summary['ratings_count'],
+                                            actual_ratings_total=summary['ratings_total'],
+                                            actual_last_review_date=Coalesce(
+                                                summary['last_review_date'], no_date))
+                                  .filter(~Q(reviews_count=F('actual_reviews_count'))
+                                          | ~Q(ratings_count=F('actual_ratings_count'))
+                                          | ~Q(ratings_total=F('actual_ratings_total'))
+                                          | ~Q(actual_last_review_date=Coalesce(
+                                              'last_review_date', no_date)))
+                                  .values_list('pk', flat=True))
+        updated = Product.objects \
+                         .filter(pk__in=drifted_ids) \
+                         .update(**summary)
+
+        invalidate_products(drifted_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled the review summary of {updated} product(s).'))
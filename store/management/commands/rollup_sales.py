@@ -0,0 +1,37 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from store.models import ArchivedOrder
+from store.sales import rollup
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the sales rollups of recent days from the order items.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=2,
+                            help='Days to recompute, today included.')
+        parser.add_argument('--since', type=date.fromisoformat,
+                            help='First day to recompute, instead of --days.')
+
+    def handle(self, *args, **options):
+        until = timezone.localdate()
+        since = options['since'] or until - timedelta(days=options['days'] - 1)
+
+        # The items of archived orders are gone, so their days keep the
+        # rollups they had when they were archived.
+        archived_until = ArchivedOrder.objects.aggregate(Max('placed_at'))['placed_at__max']
+        if archived_until and since <= timezone.localdate(archived_until):
+            since = timezone.localdate(archived_until) + timedelta(days=1)
+            self.stdout.write(self.style.WARNING(
+                f'Days with archived orders are skipped, starting at {since}.'))
+        if since > until:
+            return
+
+        counts = rollup(since, until)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up the sales from {since} to {until}: '
+            + ', '.join(f'{count} {name} row(s)' for name, count in counts.items()) + '.'))
@@ -1,12 +1,17 @@
+from decimal import Decimal
 from uuid import uuid4
-from django.db import models
+from django.db import models, connections, transaction, IntegrityError
 from django.conf import settings
-from django.core.validators import MinValueValidator
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 from .validators import validate_image_size
 
 
 class Collection(models.Model):
     title = models.CharField(max_length=50, unique=True)
+    # Maintained by the product signal handlers, see store/signals/handlers.py.
+    products_count = models.PositiveIntegerField(default=0, editable=False)
 
 
 class Product(models.Model):
@@ -16,8 +21,36 @@ class Product(models.Model):
     last_update = models.DateField(auto_now=True)
     unit_price = models.DecimalField(
         max_digits=6, decimal_places=2, validators=[MinValueValidator(0.1)])
+    # Indexed by store_product_coll_price_idx.
     collection = models.ForeignKey(
-        Collection, on_delete=models.PROTECT, related_name='products')
+        Collection, on_delete=models.PROTECT, related_name='products',
+        db_index=False)
+    # Maintained by a database trigger on Postgres, see store/search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Summary of the reviews, maintained by the review signal handlers, see
+    # store/signals/handlers.py.
+    reviews_count = models.PositiveIntegerField(default=0, editable=False)
+    # Of the reviews with a rating.
+    ratings_count = models.PositiveIntegerField(default=0, editable=False)
+    ratings_total = models.PositiveIntegerField(default=0, editable=False)
+    last_review_date = models.DateField(null=True, editable=False)
+
+    class Meta:
+        # For ProductFilter, which filters by collection and price range.
+        # store/tests/test_query_plans.py checks they are used.
+        indexes = [
+            models.Index(fields=['collection', 'unit_price'],
+                         name='store_product_coll_price_idx'),
+            models.Index(fields=['collection', 'unit_price'],
+                         name='store_product_in_stock_idx',
+                         condition=models.Q(inventory__gt=0)),
+        ]
+
+    @property
+    def average_rating(self):
+        if not self.ratings_count:
+            return None
+        return Decimal(self.ratings_total) / self.ratings_count
 
 
 class ProductImage(models.Model):
@@ -25,11 +58,64 @@ class ProductImage(models.Model):
         Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(
         upload_to='store/images', validators=[validate_image_size])
+    # Storage names of the resized copies by variant and format, e.g.
+    # {'thumbnail': {'jpeg': ..., 'webp': ...}}. Empty until they are
+    # generated in the background, see store/images.py.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
+
+class CartManager(models.Manager):
+    def touch(self, cart_id):
+        self.filter(pk=cart_id).update(last_activity=timezone.now())
 
 
 class Cart(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4)
     created_at = models.DateField(auto_now_add=True)
+    # Touched on every item change; purge_carts deletes carts idle too long.
+    last_activity = models.DateTimeField(default=timezone.now, db_index=True)
+
+    objects = CartManager()
+
+
+class CartItemManager(models.Manager):
+    def add_quantity(self, cart_id, product_id, quantity):
+        # Adds to the quantity of the cart item in a single statement, so
+        # concurrent adds of the same product never lose an increment.
+        connection = connections[self.db]
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            return self._add_quantity_with_retry(cart_id, product_id, quantity)
+
+        opts = self.model._meta
+        table = connection.ops.quote_name(opts.db_table)
+        params = [
+            opts.get_field('cart').get_db_prep_value(cart_id, connection),
+            opts.get_field('product').get_db_prep_value(product_id, connection),
+            quantity,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {table} (cart_id, product_id, quantity)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (cart_id, product_id)
+                DO UPDATE SET quantity = {table}.quantity + EXCLUDED.quantity
+                RETURNING id, quantity
+            """, params)
+            id, quantity = cursor.fetchone()
+
+        return self.model(id=id, cart_id=cart_id, product_id=product_id, quantity=quantity)
+
+    def _add_quantity_with_retry(self, cart_id, product_id, quantity):
+        cart_items = self.filter(cart_id=cart_id, product_id=product_id)
+        with transaction.atomic(using=self.db):
+            if not cart_items.update(quantity=models.F('quantity') + quantity):
+                try:
+                    with transaction.atomic(using=self.db):
+                        return self.create(cart_id=cart_id, product_id=product_id, quantity=quantity)
+                except IntegrityError:
+                    # Another request created the item in the meantime.
+                    cart_items.update(quantity=models.F('quantity') + quantity)
+            return cart_items.get()
 
 
 class CartItem(models.Model):
@@ -39,6 +125,8 @@ class CartItem(models.Model):
     cart = models.ForeignKey(
         Cart, on_delete=models.CASCADE, related_name='items')
 
+    objects = CartItemManager()
+
     class Meta:
         unique_together = [['cart', 'product']]
 
@@ -51,22 +139,114 @@ class Customer(models.Model):
 
 
 class Order(models.Model):
-    placed_at = models.DateTimeField(auto_now_add=True)
+    placed_at = models.DateTimeField(auto_now_add=True, db_index=True)
     customer = models.ForeignKey(Customer, on_delete=models.PROTECT)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
 
 class OrderItem(models.Model):
     quantity = models.PositiveSmallIntegerField()
     unit_price = models.DecimalField(max_digits=6, decimal_places=2)
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
+    # Like the unit price, the collection of the product when it was sold,
+    # which its sales are reported in. Null for items placed before it was
+    # recorded, which are reported in the current collection.
+    collection = models.ForeignKey(
+        Collection, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False,
+        null=True)
     order = models.ForeignKey(
         Order, on_delete=models.PROTECT, related_name='items')
 
 
+class ArchivedOrder(models.Model):
+    # An order moved out of Order and OrderItem by archive_orders, with its
+    # items as they were rendered, product prices included. Partitioned by
+    # month on Postgres, see store/archive.py.
+    id = models.BigIntegerField(primary_key=True)
+    placed_at = models.DateTimeField(db_index=True)
+    customer = models.ForeignKey(
+        Customer, on_delete=models.PROTECT, related_name='archived_orders',
+        db_constraint=False)
+    total = models.DecimalField(max_digits=10, decimal_places=2)
+    items = models.JSONField()
+
+
+class IdempotentRequest(models.Model):
+    # The response to a POST with an Idempotency-Key, replayed to its
+    # retries, see store/idempotency.py. Purged by purge_idempotency_keys.
+    scope = models.CharField(max_length=100)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=32)
+    status = models.PositiveSmallIntegerField(null=True)
+    content = models.BinaryField(default=b'')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'],
+                                    name='store_idempotency_scope_key_uniq'),
+        ]
+
+
+class Sales(models.Model):
+    # Rollups of the orders placed on a day, kept up to date by
+    # store/sales.py, so that sales reports never scan the order items.
+    day = models.DateField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySales(Sales):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day'], name='store_dailysales_day_uniq'),
+        ]
+
+
+class DailyCollectionSales(Sales):
+    # Products are counted in the collection they were in when sold, see
+    # OrderItem.collection.
+    collection = models.ForeignKey(
+        Collection, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'collection'],
+                                    name='store_collsales_day_coll_uniq'),
+        ]
+
+
+class DailyProductSales(Sales):
+    # The sales of products outlive them, as their orders get archived.
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, related_name='+', db_constraint=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product'],
+                                    name='store_prodsales_day_prod_uniq'),
+        ]
+
+
 class Review(models.Model):
     description = models.TextField()
+    rating = models.PositiveSmallIntegerField(
+        null=True, blank=True, validators=[MinValueValidator(1), MaxValueValidator(5)])
     date = models.DateField(auto_now_add=True)
+    # Indexed by store_review_product_date_idx.
     product = models.ForeignKey(
-        Product, on_delete=models.CASCADE, related_name='reviews')
+        Product, on_delete=models.CASCADE, related_name='reviews',
+        db_index=False)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    class Meta:
+        # The reviews of a product, newest first.
+        indexes = [
+            models.Index(fields=['product', '-date', '-id'],
+                         name='store_review_product_date_idx'),
+        ]
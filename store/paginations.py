@@ -1,5 +1,14 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 
 
 class DefaultPagination(PageNumberPagination):
     page_size = 10
+
+
+class KeysetPagination(CursorPagination):
+    # Pages are fetched with `WHERE id > <position> ORDER BY id LIMIT n`,
+    # so deep pages cost the same as the first one and there is no COUNT(*).
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
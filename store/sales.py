@@ -0,0 +1,157 @@
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncWeek
+from django.utils import timezone
+
+from .models import (
+    Collection,
+    DailyCollectionSales,
+    DailyProductSales,
+    DailySales,
+    OrderItem,
+    Product,
+)
+
+# Placed orders are added to the sales rollups of their day once they are
+# committed. The rollup_sales command recomputes recent days from the order
+# items, for orders whose addition was lost, e.g. to a crash in between.
+# Both count products in the collection recorded on their order items.
+
+logger = logging.getLogger('ibuy.sales')
+
+SALES_FIELDS = ('revenue', 'units', 'orders')
+
+ROLLUPS = {
+    None: (DailySales, None),
+    'collection': (DailyCollectionSales, Collection),
+    'product': (DailyProductSales, Product),
+}
+
+
+def record_order(order, order_items):
+    day = timezone.localdate(order.placed_at)
+    products = [
+        {
+            'day': day,
+            'product_id': item.product_id,
+            'revenue': item.quantity * item.unit_price,
+            'units': item.quantity,
+            'orders': 1,
+        } for item in order_items
+    ]
+    collections = {}
+    for item, row in zip(order_items, products):
+        collection = collections.setdefault(item.collection_id, {
+            'day': day, 'collection_id': item.collection_id,
+            'revenue': 0, 'units': 0, 'orders': 1})
+        collection['revenue'] += row['revenue']
+        collection['units'] += row['units']
+    total = {
+        'day': day,
+        'revenue': sum(row['revenue'] for row in products),
+        'units': sum(row['units'] for row in products),
+        'orders': 1,
+    }
+
+    def add_sales():
+        # The order is committed by now: a failure must not fail its
+        # request, which clients would retry. rollup_sales repairs the days.
+        try:
+            with transaction.atomic():
+                increment(DailyProductSales, products)
+                increment(DailyCollectionSales, list(collections.values()))
+                increment(DailySales, [total])
+        except Exception:
+            logger.exception('Could not add order %s to the sales rollups.', order.pk)
+
+    # After the commit, so that the rollup rows of popular days and
+    # products are not locked while the order is placed.
+    transaction.on_commit(add_sales)
+
+
+def increment(model, rows):
+    # Adds the rows to the rollup in one INSERT ... ON CONFLICT, which
+    # Postgres and SQLite both support. Rows are sorted by their unique
+    # key, so concurrent orders lock them in the same order.
+    table = model._meta.db_table
+    unique = [model._meta.get_field(name).column
+              for name in model._meta.constraints[0].fields]
+    columns = list(rows[0])
+    rows = sorted(rows, key=lambda row: [row[column] for column in unique])
+    values = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(rows))
+    updates = ', '.join(f'{field} = {table}.{field} + EXCLUDED.{field}'
+                        for field in SALES_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(columns)}) VALUES {values} '
+            f'ON CONFLICT ({", ".join(unique)}) DO UPDATE SET {updates}',
+            [row[column] for row in rows for column in columns])
+
+
+@transaction.atomic()
+def rollup(since, until):
+    # Replaces the rollups of the days from `since` to `until`, included,
+    # with the sums of their order items.
+    start = timezone.make_aware(datetime.combine(since, time.min))
+    end = timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min))
+    items = OrderItem.objects \
+                     .filter(order__placed_at__gte=start, order__placed_at__lt=end) \
+                     .annotate(day=TruncDate('order__placed_at'),
+                               sold_in_id=Coalesce('collection_id', 'product__collection_id'))
+    sales = {
+        'revenue': Sum(ExpressionWrapper(F('quantity') * F('unit_price'),
+                                         output_field=DecimalField())),
+        'units': Sum('quantity'),
+        'orders': Count('order_id', distinct=True),
+    }
+    grains = [
+        (DailyProductSales, ['day', 'product_id']),
+        (DailyCollectionSales, ['day', 'sold_in_id']),
+        (DailySales, ['day']),
+    ]
+    counts = {}
+    for model, keys in grains:
+        model.objects.filter(day__gte=since, day__lte=until).delete()
+        rows = items.values(*keys).annotate(**sales).order_by()
+        created = model.objects.bulk_create(
+            model(**rename(row, sold_in_id='collection_id')) for row in rows)
+        counts[model.__name__] = len(created)
+    return counts
+
+
+def rename(row, **names):
+    return {names.get(key, key): value for key, value in row.items()}
+
+
+def report(period=None, by=None, since=None, until=None):
+    # Sums the rollup rows of the days from `since` to `until`, included,
+    # per day or week and per product or collection.
+    model, item_model = ROLLUPS[by]
+    queryset = model.objects.all()
+    if since:
+        queryset = queryset.filter(day__gte=since)
+    if until:
+        queryset = queryset.filter(day__lte=until)
+    keys = []
+    if period == 'week':
+        queryset = queryset.annotate(week=TruncWeek('day'))
+    if period:
+        keys.append(period)
+    if by:
+        keys.append(f'{by}_id')
+
+    sales = {field: Sum(field, default=0) for field in SALES_FIELDS}
+    if not keys:
+        return [queryset.aggregate(**sales)]
+    rows = list(queryset.values(*keys).annotate(**sales).order_by(*keys))
+    if by:
+        titles = dict(item_model.objects
+                                .filter(pk__in={row[f'{by}_id'] for row in rows})
+                                .values_list('id', 'title'))
+        for row in rows:
+            item_id = row.pop(f'{by}_id')
+            row[by] = {'id': item_id, 'title': titles.get(item_id)}
+    return rows
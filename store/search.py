@@ -0,0 +1,49 @@
+# Postgres full-text search for products: `search_vector` is maintained by
+# a trigger (title weighted above description) and covered by a GIN index,
+# and a trigram index on the title lets misspelt terms still match.
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('english', coalesce({row}.title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce({row}.description, '')), 'B')
+"""
+
+SEARCH_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f"""
+    CREATE OR REPLACE FUNCTION store_product_search_vector_update()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR.format(row='NEW')};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    'DROP TRIGGER IF EXISTS store_product_search_vector ON store_product',
+    """
+    CREATE TRIGGER store_product_search_vector
+    BEFORE INSERT OR UPDATE OF title, description, search_vector
+    ON store_product
+    FOR EACH ROW EXECUTE FUNCTION store_product_search_vector_update()
+    """,
+    f"""
+    UPDATE store_product
+    SET search_vector = {SEARCH_VECTOR.format(row='store_product')}
+    WHERE search_vector IS NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS store_product_search_vector_gin
+    ON store_product USING gin (search_vector)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS store_product_title_trgm
+    ON store_product USING gin (title gin_trgm_ops)
+    """,
+]
+
+
+def install_search(connection):
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for statement in SEARCH_SQL:
+            cursor.execute(statement)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
 from django.contrib.auth import get_user_model
 
 from .models import (
@@ -14,6 +15,9 @@ from .models import (
     ProductImage,
     Review,
 )
+from .caches import invalidate_products
+from .images import discard_variants, enqueue_variants, variant_urls
+from .sales import record_order
 
 
 class SimpleUserSerializer(serializers.ModelSerializer):
@@ -40,17 +44,36 @@ class CollectionSerializer(serializers.ModelSerializer):
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    # Empty until the resized copies are generated, see store/images.py.
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = ProductImage
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'variants']
+
+    def get_variants(self, image):
+        return variant_urls(image, self.context.get('request'))
 
     def create(self, validated_data):
         product_id = self.context['product_id']
-        return ProductImage.objects.create(product_id=product_id, **validated_data)
+        image = ProductImage.objects.create(product_id=product_id, **validated_data)
+        enqueue_variants(image.id)
+        return image
+
+    def update(self, instance, validated_data):
+        if 'image' in validated_data:
+            discard_variants(instance, instance.variants)
+            instance.variants = {}
+        image = super().update(instance, validated_data)
+        if not image.variants:
+            enqueue_variants(image.id)
+        return image
 
 
 class ProductSerializer(serializers.ModelSerializer):
     collection_id = serializers.IntegerField()
+    average_rating = serializers.DecimalField(
+        max_digits=3, decimal_places=2, read_only=True)
     images = ProductImageSerializer(many=True, read_only=True)
 
     class Meta:
@@ -63,6 +86,9 @@ class ProductSerializer(serializers.ModelSerializer):
             'last_update',
             'unit_price',
             'collection_id',
+            'reviews_count',
+            'average_rating',
+            'last_review_date',
             'images',
         ]
 
@@ -116,19 +142,60 @@ class CartItemCreateSerializer(serializers.ModelSerializer):
         product_id = validated_data['product_id']
         quantity = validated_data['quantity']
 
-        try:
-            cart_item = CartItem.objects.get(
-                cart_id=cart_id, product=product_id)
-            cart_item.quantity += quantity
-            cart_item.save()
-            self.instance = cart_item
-        except CartItem.DoesNotExist:
-            self.instance = CartItem.objects.create(
-                cart_id=cart_id, **self.validated_data)
+        self.instance = CartItem.objects.add_quantity(
+            cart_id, product_id, quantity)
 
         return self.instance
 
 
+class CartItemOperationSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    # A quantity of 0 removes the product from the cart.
+    quantity = serializers.IntegerField(min_value=0, max_value=32767)
+
+
+class CartItemBulkSerializer(serializers.Serializer):
+    items = CartItemOperationSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        product_ids = [item['product_id'] for item in items]
+        if len(set(product_ids)) != len(product_ids):
+            raise serializers.ValidationError(
+                'Each product can only appear once.')
+
+        existing_ids = Product.objects \
+                              .filter(pk__in=product_ids) \
+                              .values_list('id', flat=True)
+        missing_ids = sorted(set(product_ids) - set(existing_ids))
+        if missing_ids:
+            raise serializers.ValidationError(
+                f'No product with the given ID was found: {missing_ids}')
+        return items
+
+    @transaction.atomic()
+    def save(self, **kwargs):
+        cart_id = self.context['cart_id']
+        items = self.validated_data['items']
+
+        removed_ids = [item['product_id']
+                       for item in items if item['quantity'] == 0]
+        if removed_ids:
+            CartItem.objects \
+                    .filter(cart_id=cart_id, product_id__in=removed_ids) \
+                    .delete()
+
+        cart_items = [
+            CartItem(cart_id=cart_id, **item)
+            for item in items if item['quantity'] > 0
+        ]
+        if cart_items:
+            CartItem.objects.bulk_create(
+                cart_items,
+                update_conflicts=True,
+                unique_fields=['cart_id', 'product_id'],
+                update_fields=['quantity'])
+
+
 class CartSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
     items = CartItemSerializer(many=True, read_only=True)
@@ -175,7 +242,8 @@ class OrderItemSerializer(serializers.ModelSerializer):
 class OrderSerializer(serializers.ModelSerializer):
     customer = CustomerSerializer()
     items = OrderItemSerializer(many=True)
-    invoice_amount = serializers.SerializerMethodField()
+    invoice_amount = serializers.DecimalField(
+        source='total', max_digits=10, decimal_places=2, read_only=True)
 
     class Meta:
         model = Order
@@ -187,35 +255,23 @@ class OrderSerializer(serializers.ModelSerializer):
             'invoice_amount',
         ]
 
-    def get_invoice_amount(self, order):
-        return sum([item.quantity * item.unit_price for item in order.items.all()])
-
 
 class OrderCreateSerializer(serializers.Serializer):
     cart_id = serializers.UUIDField()
 
-    def validate_cart_id(self, cart_id):
-        if not Cart.objects.filter(pk=cart_id).exists():
-            raise serializers.ValidationError(
-                'No cart with the given ID was found.')
-        if CartItem.objects.filter(cart_id=cart_id).count() == 0:
-            raise serializers.ValidationError('The cart is empty.')
-        return cart_id
-
     @transaction.atomic()
     def create(self, validated_data):
         cart_id = validated_data['cart_id']
-        customer = Customer.objects.get(user=self.context['user'])
-        order = Order.objects.create(customer=customer)
-
-        cart_items = CartItem.objects \
-                             .filter(cart_id=cart_id) \
-                             .select_related('product')
+        cart_items = self.reserve_inventory(cart_id)
+        total = sum(item.quantity * item.product.unit_price
+                    for item in cart_items)
+        order = Order.objects.create(customer_id=self.context['customer_id'], total=total)
 
         order_items = [
             OrderItem(
                 order=order,
                 product=item.product,
+                collection_id=item.product.collection_id,
                 quantity=item.quantity,
                 unit_price=item.product.unit_price
             ) for item in cart_items
@@ -223,9 +279,49 @@ class OrderCreateSerializer(serializers.Serializer):
 
         OrderItem.objects.bulk_create(order_items)
         Cart.objects.filter(pk=cart_id).delete()
+        record_order(order, order_items)
 
         return order
 
+    def reserve_inventory(self, cart_id):
+        # Cart items and their products are locked in product id order, so
+        # concurrent orders sharing products wait for each other instead of
+        # deadlocking, and a retried order waits for the first one to finish.
+        cart_items = list(CartItem.objects
+                                  .select_related('product')
+                                  .select_for_update(of=('self', 'product'))
+                                  .filter(cart_id=cart_id)
+                                  .order_by('product_id'))
+
+        if not cart_items:
+            if not Cart.objects.filter(pk=cart_id).exists():
+                raise serializers.ValidationError(
+                    {'cart_id': ['No cart with the given ID was found.']})
+            raise serializers.ValidationError(
+                {'cart_id': ['The cart is empty.']})
+
+        short_titles = [item.product.title for item in cart_items
+                        if item.product.inventory < item.quantity]
+        if short_titles:
+            raise serializers.ValidationError(
+                {'cart_id': [f'Not enough inventory for: {", ".join(short_titles)}.']})
+
+        # The inventory condition also guards databases without row locks.
+        quantities = Case(
+            *[When(pk=item.product_id, then=Value(item.quantity))
+              for item in cart_items],
+            output_field=IntegerField())
+        product_ids = [item.product_id for item in cart_items]
+        reserved = Product.objects \
+                          .filter(pk__in=product_ids, inventory__gte=quantities) \
+                          .update(inventory=F('inventory') - quantities)
+        if reserved != len(cart_items):
+            raise serializers.ValidationError(
+                {'cart_id': ['Not enough inventory for one or more products.']})
+
+        transaction.on_commit(lambda: invalidate_products(product_ids))
+        return cart_items
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     user = SimpleUserSerializer(read_only=True)
@@ -235,6 +331,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = [
             'id',
             'description',
+            'rating',
             'date',
             'user',
         ]
@@ -243,3 +340,26 @@ class ReviewSerializer(serializers.ModelSerializer):
         product_id = self.context['product_id']
         user = self.context['user']
         return Review.objects.create(product_id=product_id, user=user, **validated_data)
+
+
+class SalesReportQuerySerializer(serializers.Serializer):
+    period = serializers.ChoiceField(['day', 'week'], required=False)
+    by = serializers.ChoiceField(['product', 'collection'], required=False)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+
+
+class SalesItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+
+
+class SalesSerializer(serializers.Serializer):
+    # A row of a sales report, with the fields it is grouped by.
+    day = serializers.DateField(required=False)
+    week = serializers.DateField(required=False)
+    product = SalesItemSerializer(required=False)
+    collection = SalesItemSerializer(required=False)
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    units = serializers.IntegerField()
+    orders = serializers.IntegerField()
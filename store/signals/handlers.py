@@ -1,10 +1,162 @@
-from store.models import Customer
+from store.models import Collection, Customer, Product, ProductImage, Review
+from store.search import install_search
+from store.archive import install_partitioning
+from store.images import discard_variants
+from store.customers import forget_customer
+from store.caches import invalidate_detail, invalidate_list, invalidate_products
 from django.conf import settings
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db import connections
+from django.db.models import F, Max, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_customer_for_new_user(sender, **kwargs):
     if kwargs['created']:
         Customer.objects.create(user=kwargs['instance'])
+
+
+@receiver(pre_save, sender=Customer)
+def remember_previous_user(sender, **kwargs):
+    customer = kwargs['instance']
+    customer.previous_user_id = Customer.objects \
+        .filter(pk=customer.pk) \
+        .values_list('user_id', flat=True) \
+        .first() if customer.pk else None
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def forget_cached_customer(sender, **kwargs):
+    # Customers are rarely saved, and a save may move them to another user,
+    # whose previous user must not keep their id either.
+    customer = kwargs['instance']
+    previous_user_id = getattr(customer, 'previous_user_id', None)
+    forget_customer(*{customer.user_id, previous_user_id} - {None})
+
+
+@receiver(post_migrate)
+def install_product_search(sender, **kwargs):
+    if kwargs['app_config'].label == 'store':
+        install_search(connections[kwargs['using']])
+
+
+@receiver(post_migrate)
+def install_order_archive_partitioning(sender, **kwargs):
+    if kwargs['app_config'].label == 'store':
+        install_partitioning(connections[kwargs['using']])
+
+
+@receiver([post_save, post_delete], sender=Collection)
+def invalidate_cached_collections(sender, **kwargs):
+    invalidate_list('collections')
+    invalidate_detail('collections', kwargs['instance'].pk)
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_collection(sender, **kwargs):
+    product = kwargs['instance']
+    product.previous_collection_id = Product.objects \
+        .filter(pk=product.pk) \
+        .values_list('collection_id', flat=True) \
+        .first() if product.pk else None
+
+
+def add_to_products_count(collection_id, delta):
+    Collection.objects \
+        .filter(pk=collection_id) \
+        .update(products_count=F('products_count') + delta)
+
+
+@receiver(post_save, sender=Product)
+def count_saved_product(sender, **kwargs):
+    product = kwargs['instance']
+    previous_collection_id = getattr(product, 'previous_collection_id', None)
+    if kwargs['created']:
+        add_to_products_count(product.collection_id, 1)
+    elif previous_collection_id not in (None, product.collection_id):
+        add_to_products_count(previous_collection_id, -1)
+        add_to_products_count(product.collection_id, 1)
+
+
+@receiver(post_delete, sender=Product)
+def count_deleted_product(sender, **kwargs):
+    add_to_products_count(kwargs['instance'].collection_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_cached_products(sender, **kwargs):
+    product = kwargs['instance']
+    invalidate_list('products')
+    invalidate_detail('products', product.pk)
+    # Collections include their products count.
+    invalidate_list('collections')
+    invalidate_detail('collections', product.collection_id)
+    previous_collection_id = getattr(product, 'previous_collection_id', None)
+    if previous_collection_id not in (None, product.collection_id):
+        invalidate_detail('collections', previous_collection_id)
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_cached_product_images(sender, **kwargs):
+    invalidate_list('products')
+    invalidate_detail('products', kwargs['instance'].product_id)
+
+
+@receiver(post_delete, sender=ProductImage)
+def delete_image_variants(sender, **kwargs):
+    image = kwargs['instance']
+    discard_variants(image, image.variants)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, **kwargs):
+    review = kwargs['instance']
+    review.previous_rating = Review.objects \
+        .filter(pk=review.pk) \
+        .values_list('rating', flat=True) \
+        .first() if review.pk else None
+
+
+def is_rated(rating):
+    # Reviews without a rating are left out of the average.
+    return 0 if rating is None else 1
+
+
+@receiver(post_save, sender=Review)
+def summarize_saved_review(sender, **kwargs):
+    review = kwargs['instance']
+    products = Product.objects.filter(pk=review.product_id)
+    if kwargs['created']:
+        products.update(
+            reviews_count=F('reviews_count') + 1,
+            ratings_count=F('ratings_count') + is_rated(review.rating),
+            ratings_total=F('ratings_total') + (review.rating or 0),
+            last_review_date=Greatest(
+                Coalesce('last_review_date', Value(review.date)), Value(review.date)))
+    elif review.previous_rating != review.rating:
+        products.update(
+            ratings_count=F('ratings_count')
+            + is_rated(review.rating) - is_rated(review.previous_rating),
+            ratings_total=F('ratings_total')
+            + (review.rating or 0) - (review.previous_rating or 0))
+    else:
+        return
+    invalidate_products([review.product_id])
+
+
+@receiver(post_delete, sender=Review)
+def summarize_deleted_review(sender, **kwargs):
+    review = kwargs['instance']
+    Product.objects.filter(pk=review.product_id).update(
+        reviews_count=F('reviews_count') - 1,
+        ratings_count=F('ratings_count') - is_rated(review.rating),
+        ratings_total=F('ratings_total') - (review.rating or 0),
+        last_review_date=Subquery(
+            Review.objects
+                  .filter(product_id=review.product_id)
+                  .values('product_id')
+                  .annotate(date=Max('date'))
+                  .values('date')))
+    invalidate_products([review.product_id])
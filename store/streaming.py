@@ -0,0 +1,38 @@
+from django.http import StreamingHttpResponse
+
+from core.renderers import FastJSONRenderer
+
+
+class StreamingListMixin:
+    # `?stream=true` streams an unpaginated list as a JSON array. The
+    # queryset is iterated in chunks with a server-side cursor where the
+    # database supports it, so memory stays flat however many rows match.
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') not in ('1', 'true') \
+                or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_json(queryset), content_type='application/json')
+
+    def stream_json(self, queryset):
+        renderer = FastJSONRenderer()
+        separator = b''
+        chunk = []
+        yield b'['
+        for obj in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                yield separator + self.render_chunk(renderer, chunk)
+                separator = b','
+                chunk = []
+        if chunk:
+            yield separator + self.render_chunk(renderer, chunk)
+        yield b']'
+
+    def render_chunk(self, renderer, chunk):
+        # The items of the rendered array, without its brackets.
+        return renderer.render(self.get_serializer(chunk, many=True).data)[1:-1]
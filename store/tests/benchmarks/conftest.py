@@ -0,0 +1,43 @@
+import os
+import time
+import statistics
+
+import pytest
+from django.db import connection
+
+
+@pytest.fixture
+def bench_size():
+    def do_bench_size(name, default):
+        # Seed sizes can be scaled down locally, e.g. BENCH_PRODUCTS=1000.
+        return int(os.environ.get(f'BENCH_{name.upper()}', default))
+    return do_bench_size
+
+
+@pytest.fixture
+def measure():
+    def do_measure(func, repeat=20):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+    return do_measure
+
+
+@pytest.fixture
+def count_queries():
+    # Counted with an execute wrapper, because every test client request
+    # resets `connection.queries`.
+    def do_count_queries(func):
+        queries = []
+
+        def record(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            func()
+        return len(queries)
+    return do_count_queries
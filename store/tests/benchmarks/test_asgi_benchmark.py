@@ -0,0 +1,75 @@
+import http.client
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import pytest
+
+# Load test of running deployments, not of the test database. Start both
+# servers against the same seeded database (e.g. after import_products),
+# then point the benchmark at them:
+#
+#   gunicorn ibuy.wsgi -w 4 -b 127.0.0.1:8001
+#   gunicorn ibuy.asgi:application -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8002
+#   BENCH_WSGI_URL=http://127.0.0.1:8001 BENCH_ASGI_URL=http://127.0.0.1:8002 \
+#       pytest -m benchmark -s store/tests/benchmarks/test_asgi_benchmark.py
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(
+        not os.environ.get('BENCH_WSGI_URL') or not os.environ.get('BENCH_ASGI_URL'),
+        reason='BENCH_WSGI_URL and BENCH_ASGI_URL are not set'),
+]
+
+
+def request(base_url, method, path):
+    url = urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port)
+    connection.request(method, path, headers={'Accept': 'application/json'})
+    response = connection.getresponse()
+    return json.loads(response.read())
+
+
+def load(base_url, path, seconds, concurrency):
+    # Each client sends requests one after the other over a keep-alive
+    # connection until the time is up.
+    url = urlsplit(base_url)
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        connection = http.client.HTTPConnection(url.hostname, url.port)
+        count = errors = 0
+        while time.perf_counter() < deadline:
+            connection.request('GET', path, headers={'Accept': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            count += 1
+            errors += response.status != 200
+        return count, errors
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(lambda _: client(), range(concurrency)))
+    return sum(count for count, _ in results) / seconds, sum(errors for _, errors in results)
+
+
+def test_requests_per_second(bench_size):
+    wsgi_url, asgi_url = os.environ['BENCH_WSGI_URL'], os.environ['BENCH_ASGI_URL']
+    seconds = bench_size('load_seconds', 10)
+    concurrency = bench_size('load_concurrency', 32)
+
+    product_id = request(wsgi_url, 'GET', '/store/products/')['results'][0]['id']
+    cart_id = request(wsgi_url, 'POST', '/store/carts/')['id']
+    paths = [
+        '/store/products/',
+        f'/store/products/{product_id}/',
+        '/store/collections/',
+        f'/store/carts/{cart_id}/',
+    ]
+
+    for path in paths:
+        rates = {}
+        for name, base_url in [('wsgi', wsgi_url), ('asgi', asgi_url)]:
+            rates[name], errors = load(base_url, path, seconds, concurrency)
+            assert not errors
+        print(f'{path:>50}: wsgi {rates["wsgi"]:8.0f} req/s, asgi {rates["asgi"]:8.0f} req/s')
@@ -0,0 +1,36 @@
+import pytest
+from model_bakery import baker
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth import get_user_model
+from core.serializers import TokenObtainPairSerializer
+from store.caches import get_cache
+from store.models import Order, OrderItem
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+User = get_user_model()
+
+
+def test_stateless_authentication_saves_the_user_query(measure, count_queries):
+    user = baker.make(User)
+    for _ in range(3):
+        baker.make(OrderItem, order=baker.make(Order, customer=user.customer), _quantity=2)
+
+    tokens = [
+        # A token without claims loads the user, like simplejwt does.
+        ('database user', RefreshToken.for_user(user).access_token),
+        ('token user', TokenObtainPairSerializer.get_token(user).access_token),
+    ]
+    for name, token in tokens:
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'JWT {token}')
+
+        def request():
+            assert client.get('/store/orders/').status_code == 200
+
+        request()
+        queries = count_queries(request)
+        median_ms = measure(request, repeat=200)
+        get_cache().clear()
+        print(f'{name:>15}: {queries} queries, {median_ms:8.3f}ms per request')
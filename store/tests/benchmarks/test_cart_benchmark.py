@@ -0,0 +1,29 @@
+import pytest
+from model_bakery import baker
+from store.models import Cart, Product
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+@pytest.fixture
+def products(bench_size):
+    return baker.make(Product, _quantity=bench_size('cart_items', 30))
+
+
+def test_bulk_vs_per_item_cart_sync(api_client, products, measure, count_queries):
+    def per_item():
+        cart = baker.make(Cart)
+        for product in products:
+            api_client.post(f'/store/carts/{cart.id}/items/',
+                            {'product_id': product.id, 'quantity': 1})
+
+    def bulk():
+        cart = baker.make(Cart)
+        api_client.post(f'/store/carts/{cart.id}/items/bulk/', {'items': [
+            {'product_id': product.id, 'quantity': 1} for product in products
+        ]}, format='json')
+
+    for name, sync in [('per_item', per_item), ('bulk', bulk)]:
+        queries = count_queries(sync)
+        median_ms = measure(sync, repeat=10)
+        print(f'{name:>10}: {median_ms:8.2f}ms {queries:5} queries')
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+from model_bakery import baker
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from store.models import Collection, Product
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def test_import_vs_per_row_api(api_client, authenticate, bench_size, tmp_path):
+    rows = bench_size('catalog_rows', 20_000)
+    per_row = bench_size('catalog_api_rows', 200)
+    collection = baker.make(Collection, title='Catalog')
+    path = tmp_path / 'products.csv'
+    path.write_text('title,description,inventory,unit_price,collection\n' + ''.join(
+        f'Product {i},,{i},9.99,Catalog\n' for i in range(rows)))
+
+    authenticate(baker.make(get_user_model(), is_staff=True))
+    start = time.perf_counter()
+    for i in range(per_row):
+        api_client.post('/store/products/', {
+            'title': f'Api product {i}', 'inventory': i,
+            'unit_price': '9.99', 'collection_id': collection.id})
+    api_rate = per_row / (time.perf_counter() - start)
+
+    for _ in range(2):
+        # The second run updates every row instead of inserting it.
+        start = time.perf_counter()
+        call_command('import_products', str(path), stdout=None)
+        import_rate = rows / (time.perf_counter() - start)
+        print(f'api {api_rate:8.0f} rows/s, import {import_rate:8.0f} rows/s')
+
+    start = time.perf_counter()
+    call_command('export_products', str(tmp_path / 'export.jsonl'), stdout=None)
+    print(f'export {Product.objects.count() / (time.perf_counter() - start):8.0f} rows/s')
@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.db.utils import load_backend
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def request_cycle(db):
+    # What Django does around every request: request_started and
+    # request_finished both call close_if_unusable_or_obsolete().
+    db.close_if_unusable_or_obsolete()
+    with db.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    db.close_if_unusable_or_obsolete()
+
+
+def test_per_request_connection_overhead(measure):
+    modes = [
+        ('new connection', {'CONN_MAX_AGE': 0}),
+        ('persistent', {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True}),
+    ]
+    if connection.vendor == 'postgresql':
+        modes.append(('pool', {'ENGINE': 'core.backends.postgresql_pool', 'CONN_MAX_AGE': 0,
+                               'OPTIONS': {'pool_size': 4}}))
+
+    for name, settings in modes:
+        settings = {**connection.settings_dict, **settings}
+        db = load_backend(settings['ENGINE']).DatabaseWrapper(settings, alias=connection.alias)
+        try:
+            median_ms = measure(lambda: request_cycle(db), repeat=200)
+        finally:
+            db.close()
+            if hasattr(db, 'pools'):
+                db.pools.pop(connection.alias).close_idle()
+        print(f'{name:>15}: {median_ms:8.3f}ms per request')
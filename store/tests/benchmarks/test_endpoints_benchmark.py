@@ -0,0 +1,332 @@
+# Profiles every route of store/urls.py over a seeded store, on Postgres with
+# the default settings or on SQLite with ibuy/settings/bench_sqlite.py:
+#   pytest -m benchmark store/tests/benchmarks/test_endpoints_benchmark.py
+#   pytest -m benchmark --ds=ibuy.settings.bench_sqlite store/tests/benchmarks/test_endpoints_benchmark.py
+# Seed sizes scale with BENCH_* variables (e.g. BENCH_PRODUCTS=2000), results
+# go to bench_results.json and BENCH_UPDATE_BASELINE=1 rewrites baseline.json.
+# The committed baseline is from bench_sqlite at the scale recorded in it;
+# runs on another database only report their results.
+import io
+import json
+import math
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from model_bakery import baker
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+
+from store.caches import get_cache
+from store.models import (
+    Cart,
+    CartItem,
+    Collection,
+    Customer,
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    Review,
+)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+User = get_user_model()
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+BATCH_SIZE = 10_000
+
+
+def bulk_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+
+
+def seed_store(scale):
+    collections = Collection.objects.bulk_create(
+        Collection(title=f'Collection {i}') for i in range(scale['collections']))
+
+    bulk_create(Product, (
+        Product(
+            title=f'Product {i}',
+            description=f'Description of product {i}',
+            inventory=1_000_000,
+            unit_price=1 + i % 100,
+            collection=collections[i % len(collections)],
+        ) for i in range(scale['products'])))
+    call_command('reconcile_products_count', stdout=io.StringIO())
+    product_ids = list(Product.objects.values_list('id', flat=True))
+
+    bulk_create(User, (
+        User(username=f'user{i}', email=f'user{i}@example.com')
+        for i in range(scale['customers'])))
+    bulk_create(Customer, (
+        Customer(user_id=user_id)
+        for user_id in User.objects.values_list('id', flat=True)))
+    customer_ids = list(Customer.objects.values_list('id', flat=True))
+    user_ids = list(User.objects.values_list('id', flat=True))
+
+    bulk_create(ProductImage, (
+        ProductImage(product_id=product_id, image='store/images/seed.png')
+        for product_id in product_ids[::10]))
+    bulk_create(Review, (
+        Review(product_id=product_ids[i % 1000], user_id=user_ids[i % len(user_ids)],
+               description=f'Review {i}', rating=1 + i % 5)
+        for i in range(scale['reviews'])))
+    call_command('reconcile_review_summaries', stdout=io.StringIO())
+
+    bulk_create(Cart, (Cart() for _ in range(scale['carts'])))
+    bulk_create(CartItem, (
+        CartItem(cart_id=cart_id, product_id=product_ids[(i + j) % len(product_ids)],
+                 quantity=1)
+        for i, cart_id in enumerate(Cart.objects.values_list('id', flat=True))
+        for j in range(3)))
+
+    items_per_order = 10
+    bulk_create(Order, (
+        Order(customer_id=customer_ids[i % len(customer_ids)], total=items_per_order)
+        for i in range(scale['order_items'] // items_per_order)))
+    bulk_create(OrderItem, (
+        OrderItem(order_id=order_id, product_id=product_ids[(i + j) % len(product_ids)],
+                  quantity=1, unit_price=1)
+        for i, order_id in enumerate(Order.objects.values_list('id', flat=True))
+        for j in range(items_per_order)))
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64)).save(buffer, format='PNG')
+    return SimpleUploadedFile('bench.png', buffer.getvalue(), content_type='image/png')
+
+
+def new_cart(*products):
+    cart = Cart.objects.create()
+    for product in products:
+        CartItem.objects.create(cart=cart, product=product, quantity=1)
+    return cart
+
+
+def endpoints(customer):
+    # (name, client, method, prepare, repeat); `prepare` runs untimed before
+    # every request and returns the path and the request data.
+    product = Product.objects.order_by('id').first()
+    collection = product.collection
+    review = Review.objects.filter(user=customer).first()
+    image = ProductImage.objects.filter(product=product).first()
+    order = Order.objects.filter(customer__user=customer).first()
+    customer_id = customer.customer.id
+    items = [{'product_id': product_id, 'quantity': 2} for product_id in
+             Product.objects.values_list('id', flat=True)[:30]]
+
+    def fixed(path, data=None):
+        return lambda: (path, data)
+
+    return [
+        ('root', 'anonymous', 'get', fixed('/store/'), None),
+
+        ('collections.list', 'anonymous', 'get', fixed('/store/collections/'), None),
+        ('collections.retrieve', 'anonymous', 'get',
+         fixed(f'/store/collections/{collection.id}/'), None),
+        ('collections.create', 'staff', 'post', lambda: (
+            '/store/collections/', {'title': f'Bench {time.perf_counter_ns()}'}), None),
+        ('collections.update', 'staff', 'patch',
+         fixed(f'/store/collections/{collection.id}/', {'title': collection.title}), None),
+        ('collections.destroy', 'staff', 'delete', lambda: (
+            f'/store/collections/{baker.make(Collection).id}/', None), None),
+
+        ('products.list', 'anonymous', 'get', fixed('/store/products/'), None),
+        ('products.list.deep', 'anonymous', 'get', lambda: (
+            '/store/products/', {'page': Product.objects.count() // 10}), None),
+        ('products.list.cursor', 'anonymous', 'get',
+         fixed('/store/products/', {'pagination': 'cursor'}), None),
+        ('products.list.search', 'anonymous', 'get',
+         fixed('/store/products/', {'search': 'Product 42'}), None),
+        ('products.list.filter', 'anonymous', 'get', fixed(
+            '/store/products/', {'collection_id': collection.id, 'unit_price__lt': 50}), None),
+        ('products.retrieve', 'anonymous', 'get',
+         fixed(f'/store/products/{product.id}/'), None),
+        ('products.create', 'staff', 'post', lambda: ('/store/products/', {
+            'title': f'Bench {time.perf_counter_ns()}', 'inventory': 1,
+            'unit_price': 1, 'collection_id': collection.id}), None),
+        ('products.update', 'staff', 'patch',
+         fixed(f'/store/products/{product.id}/', {'inventory': 1_000_000}), None),
+        ('products.destroy', 'staff', 'delete', lambda: (
+            f'/store/products/{baker.make(Product, collection=collection).id}/', None), None),
+
+        ('product-images.list', 'anonymous', 'get',
+         fixed(f'/store/products/{product.id}/images/'), None),
+        ('product-images.retrieve', 'anonymous', 'get',
+         fixed(f'/store/products/{product.id}/images/{image.id}/'), None),
+        ('product-images.create', 'staff', 'post', lambda: (
+            f'/store/products/{product.id}/images/', {'image': make_image()}), None),
+        ('product-images.destroy', 'staff', 'delete', lambda: (
+            f'/store/products/{product.id}/images/'
+            f'{ProductImage.objects.create(product=product, image="store/images/x.png").id}/',
+            None), None),
+
+        ('product-reviews.list', 'anonymous', 'get',
+         fixed(f'/store/products/{review.product_id}/reviews/'), None),
+        ('product-reviews.retrieve', 'anonymous', 'get',
+         fixed(f'/store/products/{review.product_id}/reviews/{review.id}/'), None),
+        ('product-reviews.create', 'customer', 'post',
+         fixed(f'/store/products/{product.id}/reviews/',
+               {'description': 'Bench', 'rating': 4}), None),
+        ('product-reviews.update', 'customer', 'patch', fixed(
+            f'/store/products/{review.product_id}/reviews/{review.id}/',
+            {'description': 'Bench'}), None),
+        ('product-reviews.destroy', 'customer', 'delete', lambda: (
+            f'/store/products/{product.id}/reviews/'
+            f'{Review.objects.create(product=product, user=customer, description="x", rating=1).id}/',
+            None), None),
+
+        ('carts.create', 'anonymous', 'post', fixed('/store/carts/'), None),
+        ('carts.retrieve', 'anonymous', 'get', lambda: (
+            f'/store/carts/{Cart.objects.first().id}/', None), None),
+        ('carts.destroy', 'anonymous', 'delete', lambda: (
+            f'/store/carts/{new_cart(product).id}/', None), None),
+
+        ('cart-items.list', 'anonymous', 'get', lambda: (
+            f'/store/carts/{Cart.objects.first().id}/items/', None), None),
+        ('cart-items.retrieve', 'anonymous', 'get', lambda: (
+            '/store/carts/{0.cart_id}/items/{0.id}/'.format(CartItem.objects.first()), None), None),
+        ('cart-items.create', 'anonymous', 'post', lambda: (
+            f'/store/carts/{Cart.objects.first().id}/items/',
+            {'product_id': product.id, 'quantity': 1}), None),
+        ('cart-items.update', 'anonymous', 'patch', lambda: (
+            '/store/carts/{0.cart_id}/items/{0.id}/'.format(CartItem.objects.first()),
+            {'quantity': 1}), None),
+        ('cart-items.destroy', 'anonymous', 'delete', lambda: (
+            '/store/carts/{0.cart_id}/items/{0.id}/'.format(
+                new_cart(product).items.get()), None), None),
+        ('cart-items.bulk', 'anonymous', 'post', lambda: (
+            f'/store/carts/{new_cart().id}/items/bulk/', {'items': items}), None),
+
+        ('customers.list', 'staff', 'get', fixed('/store/customers/'), 3),
+        ('customers.retrieve', 'staff', 'get', fixed(f'/store/customers/{customer_id}/'), None),
+        ('customers.update', 'staff', 'patch',
+         fixed(f'/store/customers/{customer_id}/', {'phone': '123'}), None),
+        ('customers.me', 'customer', 'get', fixed('/store/customers/me/'), None),
+        ('customers.me.update', 'customer', 'put',
+         fixed('/store/customers/me/', {'phone': '123'}), None),
+
+        ('orders.list', 'customer', 'get', fixed('/store/orders/'), None),
+        ('orders.list.staff', 'staff', 'get', fixed('/store/orders/'), 3),
+        ('orders.retrieve', 'customer', 'get', fixed(f'/store/orders/{order.id}/'), None),
+        ('orders.create', 'customer', 'post', lambda: (
+            '/store/orders/', {'cart_id': str(new_cart(product).id)}), None),
+        ('orders.destroy', 'staff', 'delete', lambda: (
+            f'/store/orders/{Order.objects.create(customer=customer.customer).id}/', None), None),
+
+        ('cache-stats', 'staff', 'get', fixed('/store/cache-stats/'), None),
+    ]
+
+
+def percentile(timings, percent):
+    ordered = sorted(timings)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def profile(client, method, prepare, repeat):
+    def request():
+        path, data = prepare()
+        # Measure the uncached path of the product and collection endpoints.
+        get_cache().clear()
+        send = getattr(client, method)
+        # Uploads are multipart, every other write is JSON.
+        options = {} if method == 'get' or 'image' in (data or {}) else {'format': 'json'}
+        start = time.perf_counter()
+        response = send(path, data, **options)
+        return response, (time.perf_counter() - start) * 1000
+
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    # One traced run for queries and memory, so tracing does not skew the timings.
+    tracemalloc.start()
+    try:
+        with connection.execute_wrapper(record):
+            response, _ = request()
+        allocated = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert response.status_code < 400, (response.status_code, getattr(response, 'data', None))
+
+    timings = [request()[1] for _ in range(repeat)]
+    return {
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'queries': len(queries),
+        'allocated_kb': round(allocated / 1024, 1),
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    regressions = []
+    # Query counts differ between databases, e.g. for savepoints.
+    same_database = baseline.get('database') == results['database']
+    comparable = same_database and baseline.get('scale') == results['scale']
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if previous is None or not same_database:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f'{name}: {previous["queries"]} -> {current["queries"]} queries')
+        # Timings and memory depend on the data volume and the database.
+        if not comparable:
+            continue
+        # The absolute slack keeps jitter on fast endpoints from failing the run.
+        for metric, slack in [('p95_ms', 5), ('allocated_kb', 64)]:
+            if current[metric] > previous[metric] * tolerance + slack:
+                regressions.append(f'{name}: {metric} {previous[metric]} -> {current[metric]}')
+    return regressions
+
+
+def test_every_endpoint(bench_size, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    scale = {
+        'collections': bench_size('collections', 100),
+        'products': bench_size('products', 100_000),
+        'customers': bench_size('customers', 10_000),
+        'reviews': bench_size('reviews', 10_000),
+        'carts': bench_size('carts', 10_000),
+        'order_items': bench_size('order_items', 1_000_000),
+    }
+    seed_store(scale)
+
+    clients = {'anonymous': APIClient(), 'customer': APIClient(), 'staff': APIClient()}
+    customer = User.objects.get(customer__id=Customer.objects.order_by('id').first().id)
+    clients['customer'].force_authenticate(customer)
+    clients['staff'].force_authenticate(baker.make(User, is_staff=True))
+
+    results = {'database': connection.vendor, 'scale': scale, 'endpoints': {}}
+    for name, client, method, prepare, repeat in endpoints(customer):
+        results['endpoints'][name] = profile(
+            clients[client], method, prepare, repeat or bench_size('repeat', 20))
+        print(f'{name:>26}: {results["endpoints"][name]}')
+
+    Path(os.environ.get('BENCH_RESULTS', 'bench_results.json')).write_text(
+        json.dumps(results, indent=2))
+    if os.environ.get('BENCH_UPDATE_BASELINE'):
+        BASELINE_PATH.write_text(json.dumps(results, indent=2) + '\n')
+        return
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    tolerance = float(os.environ.get('BENCH_TOLERANCE', 1.5))
+    regressions = find_regressions(results, baseline, tolerance)
+    assert not regressions, '\n'.join(regressions)
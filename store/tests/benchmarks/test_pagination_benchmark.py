@@ -0,0 +1,45 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from model_bakery import baker
+from rest_framework.pagination import Cursor
+from store.models import Collection, Product
+from store.paginations import DefaultPagination, KeysetPagination
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+DEEP_PAGE = 10_000
+
+
+@pytest.fixture
+def product_ids(bench_size):
+    size = bench_size('products', DEEP_PAGE * DefaultPagination.page_size)
+    collection = baker.make(Collection)
+    baker.make(Product, collection=collection,
+               _quantity=size, _bulk_create=True)
+    return list(Product.objects.order_by('id').values_list('id', flat=True))
+
+
+def encode_cursor(position):
+    paginator = KeysetPagination()
+    paginator.base_url = '/'
+    url = paginator.encode_cursor(
+        Cursor(offset=0, reverse=False, position=str(position)))
+    return parse_qs(urlparse(url).query)['cursor'][0]
+
+
+def test_first_and_deep_page_latency(api_client, product_ids, measure):
+    page_size = DefaultPagination.page_size
+    deep_page = min(DEEP_PAGE, len(product_ids) // page_size)
+    deep_cursor = encode_cursor(product_ids[(deep_page - 1) * page_size - 1])
+
+    requests = {
+        'page_number[1]': {},
+        f'page_number[{deep_page}]': {'page': deep_page},
+        'cursor[1]': {'pagination': 'cursor'},
+        f'cursor[{deep_page}]': {'pagination': 'cursor', 'cursor': deep_cursor},
+    }
+
+    for name, params in requests.items():
+        median_ms = measure(lambda: api_client.get('/store/products/', params))
+        print(f'{name:>20}: {median_ms:8.2f}ms')
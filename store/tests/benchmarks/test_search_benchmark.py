@@ -0,0 +1,42 @@
+import random
+
+import pytest
+from model_bakery import baker
+from store.models import Collection, Product
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+WORDS = [
+    'red', 'blue', 'green', 'wooden', 'steel', 'leather', 'organic',
+    'apple', 'chair', 'table', 'lamp', 'jacket', 'coffee', 'notebook',
+    'kettle', 'guitar', 'backpack', 'pillow', 'bottle', 'candle',
+]
+
+
+@pytest.fixture
+def catalog(bench_size):
+    size = bench_size('products', 1_000_000)
+    collection = baker.make(Collection)
+    rng = random.Random(0)
+
+    batch = []
+    for i in range(size):
+        batch.append(Product(
+            title=f'{" ".join(rng.sample(WORDS, 2))} {i}',
+            description=' '.join(rng.choices(WORDS, k=12)),
+            inventory=10,
+            unit_price=1,
+            collection=collection,
+        ))
+        if len(batch) == 10_000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+
+
+def test_search_latency(api_client, catalog, measure):
+    # A single word, a phrase, a typo and a term that matches nothing.
+    for term in ['apple', 'wooden chair', 'guitr', 'missing']:
+        median_ms = measure(
+            lambda: api_client.get('/store/products/', {'search': term}), repeat=5)
+        print(f'{f"search[{term}]":>22}: {median_ms:8.2f}ms')
@@ -0,0 +1,42 @@
+import pytest
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from django.contrib.auth import get_user_model
+from store.fast_serializers import FastCartSerializer, FastOrderSerializer, FastProductSerializer
+from store.models import Cart, CartItem, Customer, Order, OrderItem, Product, ProductImage
+from store.serializers import CartSerializer, OrderSerializer, ProductSerializer
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def test_fast_serializers_cpu(bench_size, measure):
+    rows = bench_size('rows', 1000)
+    products = baker.make(Product, _quantity=rows, _bulk_create=True)
+    ProductImage.objects.bulk_create(
+        ProductImage(product=product, image='store/images/a.png') for product in products)
+    cart = baker.make(Cart)
+    CartItem.objects.bulk_create(
+        CartItem(cart=cart, product=product, quantity=2) for product in products)
+    customer = Customer.objects.get(user=baker.make(get_user_model()))
+    orders = Order.objects.bulk_create(Order(customer=customer) for _ in range(rows))
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, product=products[i], quantity=1, unit_price=1)
+        for order in orders for i in range(3))
+
+    # Querysets are evaluated up front, so only serialization is measured.
+    request = APIRequestFactory().get('/store/products/')
+    cases = [
+        ('products', ProductSerializer, FastProductSerializer,
+         list(Product.objects.prefetch_related('images')), True),
+        ('cart', CartSerializer, FastCartSerializer,
+         Cart.objects.prefetch_related('items__product').get(), False),
+        ('orders', OrderSerializer, FastOrderSerializer,
+         list(Order.objects.select_related('customer__user').prefetch_related('items__product')),
+         True),
+    ]
+    for name, serializer_class, fast_serializer_class, instance, many in cases:
+        for label, cls in [('drf', serializer_class), ('fast', fast_serializer_class)]:
+            median_ms = measure(lambda: JSONRenderer().render(
+                cls(instance, many=many, context={'request': request}).data), repeat=10)
+            print(f'{name:>10} {label:>5}: {median_ms:8.2f}ms')
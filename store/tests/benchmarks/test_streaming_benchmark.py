@@ -0,0 +1,44 @@
+import tracemalloc
+
+import pytest
+from model_bakery import baker
+from django.contrib.auth import get_user_model
+from store.models import Customer, Order, OrderItem, Product
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+
+def consume(response):
+    # Drops the chunks as a client would, instead of joining them.
+    for _ in response.streaming_content:
+        pass
+
+
+def peak_kb(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def test_streamed_list_memory(api_client, authenticate, bench_size):
+    User = get_user_model()
+    products = baker.make(Product, _quantity=10)
+    customer = Customer.objects.get(user=baker.make(User))
+    authenticate(baker.make(User, is_staff=True))
+
+    seeded = 0
+    for orders in [bench_size('orders', 10_000) // 10, bench_size('orders', 10_000)]:
+        created = Order.objects.bulk_create(
+            Order(customer=customer) for _ in range(orders - seeded))
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=product, quantity=1, unit_price=1)
+            for order in created for product in products[:3])
+        seeded = orders
+
+        buffered = peak_kb(lambda: api_client.get('/store/orders/').content)
+        streamed = peak_kb(lambda: consume(
+            api_client.get('/store/orders/', {'stream': 'true'})))
+        print(f'{orders:>8} orders: buffered {buffered:10.0f}KB, streamed {streamed:10.0f}KB')
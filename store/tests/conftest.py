@@ -1,5 +1,6 @@
 import pytest
 from rest_framework.test import APIClient
+from store.caches import get_cache, stats
 
 
 @pytest.fixture
@@ -12,3 +13,21 @@ def authenticate(api_client):
     def do_authenticate(user):
         return api_client.force_authenticate(user=user)
     return do_authenticate
+
+
+@pytest.fixture(autouse=True)
+def clear_store_cache():
+    get_cache().clear()
+    stats.clear()
+
+
+@pytest.fixture
+def shared_store_cache(settings, tmp_path):
+    # ETags are only sent with a cache shared between processes.
+    settings.CACHES = {
+        **settings.CACHES,
+        'store': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tmp_path / 'store',
+        },
+    }
@@ -0,0 +1,120 @@
+import pytest
+from asgiref.sync import async_to_sync
+from model_bakery import baker
+from store.caches import get_cache
+from store.models import Cart, CartItem, Collection, Product
+from rest_framework import status
+from django.test import AsyncClient
+
+
+@async_to_sync
+async def request(method, path, data=None, **extra):
+    return await getattr(AsyncClient(), method)(path, data, **extra)
+
+
+@pytest.fixture
+def get_both(api_client, settings):
+    # Returns the responses of the DRF view and of its async replacement.
+    def do_get_both(path, params=None):
+        sync_response = api_client.get(path, params)
+        get_cache().clear()
+        settings.ROOT_URLCONF = 'ibuy.asgi_urls'
+        return sync_response, request('get', path, params)
+    return do_get_both
+
+
+@pytest.fixture
+def async_client(settings):
+    settings.ROOT_URLCONF = 'ibuy.asgi_urls'
+
+    class Client:
+        def get(self, path, params=None, **extra):
+            return request('get', path, params, **extra)
+
+        def post(self, path, data=None):
+            return request('post', path, data)
+    return Client()
+
+
+@pytest.mark.django_db
+class TestAsyncReadPaths:
+    def test_product_list_matches_drf(self, get_both):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection, _quantity=15)
+        baker.make(Product, _quantity=2)
+
+        sync_response, async_response = get_both(
+            '/store/products/', {'collection_id': collection.id, 'page': 2})
+
+        assert async_response.status_code == status.HTTP_200_OK
+        assert async_response.content == sync_response.content
+        assert async_response['X-Cache'] == 'MISS'
+
+    def test_product_detail_matches_drf(self, get_both):
+        product = baker.make(Product)
+
+        sync_response, async_response = get_both(f'/store/products/{product.id}/')
+
+        assert async_response.content == sync_response.content
+
+    def test_collection_list_matches_drf(self, get_both):
+        baker.make(Collection, _quantity=3)
+
+        sync_response, async_response = get_both('/store/collections/')
+
+        assert async_response.content == sync_response.content
+
+    def test_cart_matches_drf(self, get_both):
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, _quantity=2)
+
+        sync_response, async_response = get_both(f'/store/carts/{cart.id}/')
+
+        assert async_response.content == sync_response.content
+
+    def test_repeated_list_is_served_from_cache(self, async_client, django_assert_num_queries):
+        baker.make(Product, _quantity=3)
+        async_client.get('/store/products/')
+
+        with django_assert_num_queries(0):
+            response = async_client.get('/store/products/')
+
+        assert response['X-Cache'] == 'HIT'
+
+    @pytest.mark.usefixtures('shared_store_cache')
+    def test_if_etag_matches_returns_304(self, api_client, async_client):
+        product = baker.make(Product)
+        etag = api_client.get(f'/store/products/{product.id}/')['ETag']
+
+        response = async_client.get(f'/store/products/{product.id}/', if_none_match=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+
+@pytest.mark.django_db
+class TestAsyncReadPathsFallback:
+    def test_if_product_does_not_exist_returns_404(self, async_client):
+        response = async_client.get('/store/products/0/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_filter_is_invalid_returns_400(self, async_client):
+        response = async_client.get('/store/products/', {'unit_price__gt': 'x'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_page_is_invalid_returns_404(self, async_client):
+        response = async_client.get('/store/products/', {'page': 2})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_writes_go_to_drf(self, async_client):
+        response = async_client.post('/store/collections/', {'title': 'a'})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_browsable_api_goes_to_drf(self, async_client):
+        response = async_client.get('/store/collections/', accept='text/html')
+
+        assert response['Content-Type'].startswith('text/html')
@@ -0,0 +1,187 @@
+import pytest
+from model_bakery import baker
+from store.models import Collection, Product, ProductImage
+from rest_framework import status
+from django.conf import settings
+
+User = settings.AUTH_USER_MODEL
+
+
+@pytest.mark.django_db
+class TestCachedProducts:
+    def test_repeated_list_is_served_from_cache(self, api_client, django_assert_num_queries):
+        baker.make(Product, _quantity=3)
+        api_client.get('/store/products/')
+
+        with django_assert_num_queries(0):
+            response = api_client.get('/store/products/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['X-Cache'] == 'HIT'
+        assert response.data['count'] == 3
+
+    def test_query_params_are_part_of_the_key(self, api_client):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection)
+        baker.make(Product)
+        api_client.get('/store/products/')
+
+        response = api_client.get(
+            '/store/products/', {'collection_id': collection.id})
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['count'] == 1
+
+    def test_product_update_invalidates_list_and_detail(self, api_client):
+        product = baker.make(Product, title='a')
+        api_client.get('/store/products/')
+        api_client.get(f'/store/products/{product.id}/')
+
+        product.title = 'b'
+        product.save()
+
+        list_response = api_client.get('/store/products/')
+        detail_response = api_client.get(f'/store/products/{product.id}/')
+        assert list_response.data['results'][0]['title'] == 'b'
+        assert detail_response.data['title'] == 'b'
+
+    def test_product_update_invalidates_detail_with_unnormalized_pk(self, api_client):
+        product = baker.make(Product, title='a')
+        api_client.get(f'/store/products/0{product.id}/')
+
+        product.title = 'b'
+        product.save()
+
+        response = api_client.get(f'/store/products/0{product.id}/')
+        assert response.data['title'] == 'b'
+
+    def test_host_is_part_of_the_list_key(self, api_client, settings):
+        settings.ALLOWED_HOSTS = ['a.example.com', 'b.example.com']
+        baker.make(Product, _quantity=11)
+        api_client.get('/store/products/', HTTP_HOST='a.example.com')
+
+        response = api_client.get('/store/products/', HTTP_HOST='b.example.com')
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.data['next'].startswith('http://b.example.com/')
+
+    def test_image_delete_invalidates_product_detail(self, api_client):
+        product = baker.make(Product)
+        image = baker.make(ProductImage, product=product)
+        api_client.get(f'/store/products/{product.id}/')
+
+        image.delete()
+
+        response = api_client.get(f'/store/products/{product.id}/')
+        assert response.data['images'] == []
+
+
+@pytest.mark.django_db
+class TestCachedCollections:
+    def test_new_product_invalidates_collection_count(self, api_client):
+        collection = baker.make(Collection)
+        api_client.get(f'/store/collections/{collection.id}/')
+
+        baker.make(Product, collection=collection)
+
+        response = api_client.get(f'/store/collections/{collection.id}/')
+        assert response.data['products_count'] == 1
+
+    def test_reassigning_product_invalidates_previous_collection(self, api_client):
+        previous, current = baker.make(Collection, _quantity=2)
+        product = baker.make(Product, collection=previous)
+        api_client.get(f'/store/collections/{previous.id}/')
+
+        product.collection = current
+        product.save()
+
+        response = api_client.get(f'/store/collections/{previous.id}/')
+        assert response.data['products_count'] == 0
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('shared_store_cache')
+class TestConditionalRequests:
+    def test_if_etag_matches_returns_304_without_queries(self, api_client,
+                                                         django_assert_num_queries):
+        baker.make(Product, _quantity=3)
+        etag = api_client.get('/store/products/')['ETag']
+
+        with django_assert_num_queries(0):
+            response = api_client.get('/store/products/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_product_update_changes_list_and_detail_etags(self, api_client):
+        product = baker.make(Product)
+        list_etag = api_client.get('/store/products/')['ETag']
+        detail_etag = api_client.get(f'/store/products/{product.id}/')['ETag']
+
+        product.save()
+
+        list_response = api_client.get('/store/products/', HTTP_IF_NONE_MATCH=list_etag)
+        detail_response = api_client.get(
+            f'/store/products/{product.id}/', HTTP_IF_NONE_MATCH=detail_etag)
+        assert list_response.status_code == status.HTTP_200_OK
+        assert detail_response.status_code == status.HTTP_200_OK
+        assert detail_response['ETag'] != detail_etag
+
+    def test_etag_of_detail_does_not_change_with_other_objects(self, api_client):
+        collection, other = baker.make(Collection, _quantity=2)
+        etag = api_client.get(f'/store/collections/{collection.id}/')['ETag']
+
+        other.title = 'Other'
+        other.save()
+
+        response = api_client.get(
+            f'/store/collections/{collection.id}/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_etag_depends_on_query_params(self, api_client):
+        baker.make(Product)
+        etag = api_client.get('/store/products/')['ETag']
+
+        response = api_client.get('/store/products/', {'page': 1}, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestConditionalRequestsWithLocalCache:
+    def test_no_etag_is_sent(self, api_client):
+        product = baker.make(Product)
+
+        list_response = api_client.get('/store/products/')
+        detail_response = api_client.get(f'/store/products/{product.id}/')
+
+        assert 'ETag' not in list_response
+        assert 'ETag' not in detail_response
+
+    def test_if_none_match_is_ignored(self, api_client):
+        baker.make(Product)
+
+        response = api_client.get('/store/products/', HTTP_IF_NONE_MATCH='*')
+
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestCacheStats:
+    def test_if_user_is_not_admin_returns_403(self, api_client, authenticate):
+        authenticate(baker.make(User))
+
+        response = api_client.get('/store/cache-stats/')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_user_is_admin_returns_counters(self, api_client, authenticate):
+        api_client.get('/store/collections/')
+        api_client.get('/store/collections/')
+        authenticate(baker.make(User, is_staff=True))
+
+        response = api_client.get('/store/cache-stats/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'collections.miss': 1, 'collections.hit': 1}
@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from model_bakery import baker
+from store.models import Cart, CartItem, Product
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.db import connection
+
+
+@pytest.fixture
+def add_cart_item(api_client):
+    def do_add_cart_item(cart_id, data):
+        return api_client.post(f'/store/carts/{cart_id}/items/', data)
+    return do_add_cart_item
+
+
+@pytest.mark.django_db
+class TestAddCartItem:
+    def test_if_product_is_new_creates_item(self, add_cart_item):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+
+        response = add_cart_item(cart.id, {'product_id': product.id, 'quantity': 2})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['id'] > 0
+        assert response.data['quantity'] == 2
+
+    def test_if_product_is_in_cart_adds_to_quantity(self, add_cart_item):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+        item = baker.make(CartItem, cart=cart, product=product, quantity=1)
+
+        response = add_cart_item(cart.id, {'product_id': product.id, 'quantity': 2})
+
+        assert response.data['id'] == item.id
+        assert response.data['quantity'] == 3
+        assert CartItem.objects.get(pk=item.id).quantity == 3
+
+    def test_if_data_is_invalid_returns_400(self, add_cart_item):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+
+        response = add_cart_item(cart.id, {'product_id': product.id, 'quantity': 0})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite' and connection.is_in_memory_db(),
+                    reason='Shared in-memory SQLite fails concurrent writers instead of waiting.')
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentAddCartItem:
+    def test_no_increment_is_lost(self):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+        requests = 50
+
+        def add_one(_):
+            try:
+                return APIClient().post(
+                    f'/store/carts/{cart.id}/items/',
+                    {'product_id': product.id, 'quantity': 1}).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            status_codes = list(executor.map(add_one, range(requests)))
+
+        assert status_codes == [status.HTTP_201_CREATED] * requests
+        assert CartItem.objects.get(cart=cart, product=product).quantity == requests
+
+
+@pytest.fixture
+def bulk_cart_items(api_client):
+    def do_bulk_cart_items(cart_id, items):
+        return api_client.post(
+            f'/store/carts/{cart_id}/items/bulk/', {'items': items}, format='json')
+    return do_bulk_cart_items
+
+
+@pytest.mark.django_db
+class TestBulkCartItems:
+    def test_adds_updates_and_removes_items(self, bulk_cart_items):
+        cart = baker.make(Cart)
+        new, updated, removed = baker.make(Product, _quantity=3)
+        baker.make(CartItem, cart=cart, product=updated, quantity=1)
+        baker.make(CartItem, cart=cart, product=removed, quantity=1)
+
+        response = bulk_cart_items(cart.id, [
+            {'product_id': new.id, 'quantity': 2},
+            {'product_id': updated.id, 'quantity': 5},
+            {'product_id': removed.id, 'quantity': 0},
+        ])
+
+        assert response.status_code == status.HTTP_200_OK
+        quantities = {item['product']['id']: item['quantity']
+                      for item in response.data['items']}
+        assert quantities == {new.id: 2, updated.id: 5}
+
+    def test_runs_constant_number_of_queries(self, bulk_cart_items, django_assert_max_num_queries):
+        cart = baker.make(Cart)
+        products = baker.make(Product, _quantity=30)
+
+        # Cart lookup, product validation, savepoint, delete, upsert,
+        # release, touch and the three queries of the cart response.
+        with django_assert_max_num_queries(10):
+            bulk_cart_items(cart.id, [
+                {'product_id': product.id, 'quantity': index % 3}
+                for index, product in enumerate(products)
+            ])
+
+    def test_if_product_does_not_exist_returns_400(self, bulk_cart_items):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+
+        response = bulk_cart_items(cart.id, [
+            {'product_id': product.id, 'quantity': 1},
+            {'product_id': 0, 'quantity': 1},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not CartItem.objects.filter(cart=cart).exists()
+
+    def test_if_product_is_repeated_returns_400(self, bulk_cart_items):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+
+        response = bulk_cart_items(cart.id, [
+            {'product_id': product.id, 'quantity': 1},
+            {'product_id': product.id, 'quantity': 2},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_cart_does_not_exist_returns_404(self, bulk_cart_items):
+        product = baker.make(Product)
+
+        response = bulk_cart_items(
+            '00000000-0000-0000-0000-000000000000', [{'product_id': product.id, 'quantity': 1}])
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import pytest
+from model_bakery import baker
+from store.models import Cart, CartItem, Product
+from django.core.management import call_command
+from django.utils import timezone
+
+
+def idle_cart(days, items=0):
+    cart = baker.make(Cart, last_activity=timezone.now() - timedelta(days=days))
+    if items:
+        baker.make(CartItem, cart=cart, _quantity=items)
+    return cart
+
+
+@pytest.mark.django_db
+class TestCartActivity:
+    def test_is_touched_when_item_is_added(self, api_client):
+        cart = idle_cart(days=10)
+
+        api_client.post(f'/store/carts/{cart.id}/items/',
+                        {'product_id': baker.make(Product).id, 'quantity': 1})
+
+        cart.refresh_from_db()
+        assert timezone.now() - cart.last_activity < timedelta(minutes=1)
+
+    def test_is_touched_when_item_is_removed(self, api_client):
+        cart = idle_cart(days=10, items=1)
+
+        api_client.delete(f'/store/carts/{cart.id}/items/{cart.items.get().id}/')
+
+        cart.refresh_from_db()
+        assert timezone.now() - cart.last_activity < timedelta(minutes=1)
+
+
+@pytest.mark.django_db
+class TestPurgeCarts:
+    def test_deletes_only_expired_carts_and_their_items(self):
+        expired = [idle_cart(days=31, items=2) for _ in range(3)]
+        active = idle_cart(days=29, items=1)
+
+        call_command('purge_carts', days=30, batch_size=2, stdout=None)
+
+        assert list(Cart.objects.all()) == [active]
+        assert not CartItem.objects.filter(cart__in=expired).exists()
+        assert CartItem.objects.count() == 1
+
+    def test_reports_purged_rows(self, capsys):
+        idle_cart(days=31, items=2)
+
+        call_command('purge_carts', days=30)
+
+        assert 'Purged 1 cart(s) and 2 item(s) in 1 batch(es)' in capsys.readouterr().out
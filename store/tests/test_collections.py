@@ -0,0 +1,94 @@
+import pytest
+from model_bakery import baker
+from store.models import Collection, Product
+from rest_framework import status
+from django.conf import settings
+from django.core.management import call_command
+
+User = settings.AUTH_USER_MODEL
+
+
+def products_count(collection):
+    collection.refresh_from_db()
+    return collection.products_count
+
+
+@pytest.mark.django_db
+class TestProductsCount:
+    def test_is_incremented_on_product_create(self):
+        collection = baker.make(Collection)
+
+        baker.make(Product, collection=collection, _quantity=2)
+
+        assert products_count(collection) == 2
+
+    def test_is_decremented_on_product_delete(self):
+        collection = baker.make(Collection)
+        product = baker.make(Product, collection=collection)
+
+        product.delete()
+
+        assert products_count(collection) == 0
+
+    def test_moves_on_collection_reassignment(self):
+        previous, current = baker.make(Collection, _quantity=2)
+        product = baker.make(Product, collection=previous)
+
+        product.collection = current
+        product.save()
+
+        assert products_count(previous) == 0
+        assert products_count(current) == 1
+
+    def test_is_unchanged_on_product_update(self):
+        collection = baker.make(Collection)
+        product = baker.make(Product, collection=collection)
+
+        product.title = 'a'
+        product.save()
+
+        assert products_count(collection) == 1
+
+    def test_drift_is_reconciled_by_command(self):
+        drifted, empty = baker.make(Collection, _quantity=2)
+        baker.make(Product, collection=drifted, _quantity=3, _bulk_create=True)
+        Collection.objects.filter(pk=empty.pk).update(products_count=5)
+
+        call_command('reconcile_products_count')
+
+        assert products_count(drifted) == 3
+        assert products_count(empty) == 0
+
+
+@pytest.mark.django_db
+class TestListCollections:
+    def test_does_not_aggregate_products(self, api_client, django_assert_num_queries):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection, _quantity=2)
+
+        with django_assert_num_queries(1) as captured:
+            response = api_client.get('/store/collections/')
+
+        assert response.data[0]['products_count'] == 2
+        assert 'store_product' not in captured[0]['sql']
+
+
+@pytest.mark.django_db
+class TestDeleteCollection:
+    def test_if_collection_has_products_returns_405(self, api_client, authenticate):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection)
+        authenticate(baker.make(User, is_staff=True))
+
+        response = api_client.delete(f'/store/collections/{collection.id}/')
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+    def test_if_collection_is_empty_returns_204(self, api_client, authenticate):
+        collection = baker.make(Collection)
+        authenticate(baker.make(User, is_staff=True))
+
+        response = api_client.delete(f'/store/collections/{collection.id}/')
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Collection.objects.filter(pk=collection.pk).exists()
@@ -0,0 +1,61 @@
+import pytest
+from model_bakery import baker
+from store.customers import resolve_customer_id
+from store.models import Customer
+from rest_framework import status
+from django.conf import settings
+
+User = settings.AUTH_USER_MODEL
+
+
+@pytest.mark.django_db
+class TestResolveCustomerId:
+    def test_is_cached_across_requests(self, django_assert_num_queries):
+        user = baker.make(User)
+        resolve_customer_id(user.id)
+
+        with django_assert_num_queries(0):
+            customer_id = resolve_customer_id(user.id)
+
+        assert customer_id == user.customer.id
+
+    def test_is_forgotten_when_customer_changes(self):
+        user = baker.make(User)
+        resolve_customer_id(user.id)
+
+        user.customer.delete()
+        customer = Customer.objects.create(user=user)
+
+        assert resolve_customer_id(user.id) == customer.id
+
+    def test_is_forgotten_for_previous_user_when_customer_moves(self):
+        previous, user = baker.make(User, _quantity=2)
+        user.customer.delete()
+        customer = previous.customer
+        resolve_customer_id(previous.id)
+
+        customer.user = user
+        customer.save()
+
+        with pytest.raises(Customer.DoesNotExist):
+            resolve_customer_id(previous.id)
+
+    def test_if_user_has_no_customer_raises(self):
+        user = baker.make(User)
+        user.customer.delete()
+
+        with pytest.raises(Customer.DoesNotExist):
+            resolve_customer_id(user.id)
+
+
+@pytest.mark.django_db
+class TestMe:
+    def test_returns_customer_of_user(self, api_client, authenticate):
+        user = baker.make(User)
+        baker.make(User)
+        authenticate(user)
+
+        response = api_client.get('/store/customers/me/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['id'] == user.customer.id
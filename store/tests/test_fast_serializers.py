@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from django.conf import settings as django_settings
+from store.fast_serializers import FastCartSerializer, FastOrderSerializer, FastProductSerializer
+from store.models import Cart, CartItem, Order, OrderItem, Product, ProductImage, Review
+from store.serializers import CartSerializer, OrderSerializer, ProductSerializer
+
+User = django_settings.AUTH_USER_MODEL
+
+
+@pytest.fixture(params=[False, True], ids=['decimal', 'string'])
+def coerce_decimal_to_string(request, settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'COERCE_DECIMAL_TO_STRING': request.param}
+
+
+@pytest.fixture
+def assert_same_json():
+    def do_assert_same_json(serializer_class, fast_serializer_class, instance, many, context=None):
+        expected = serializer_class(instance, many=many, context=context).data
+        actual = fast_serializer_class(instance, many=many, context=context).data
+        assert JSONRenderer().render(actual) == JSONRenderer().render(expected)
+    return do_assert_same_json
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('coerce_decimal_to_string')
+class TestFastSerializers:
+    def test_products_match_product_serializer(self, assert_same_json):
+        products = baker.make(Product, unit_price=Decimal('9.5'), _quantity=3)
+        baker.make(ProductImage, product=products[0], image='store/images/a.png', _quantity=2)
+        baker.make(Review, product=products[0], rating=2, _quantity=3)
+        baker.make(ProductImage, product=products[1], image='store/images/b.png',
+                   variants={'thumbnail': {'jpeg': 'store/images/variants/b_thumbnail.jpg',
+                                           'webp': 'store/images/variants/b_thumbnail.webp'}})
+        request = APIRequestFactory().get('/store/products/')
+
+        assert_same_json(ProductSerializer, FastProductSerializer,
+                         Product.objects.prefetch_related('images'), many=True,
+                         context={'request': request})
+
+    def test_cart_matches_cart_serializer(self, assert_same_json):
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, quantity=3, product__unit_price=Decimal('1.10'))
+        baker.make(CartItem, cart=cart, quantity=1, product__unit_price=Decimal('20'))
+
+        assert_same_json(CartSerializer, FastCartSerializer, cart, many=False)
+
+    def test_empty_cart_matches_cart_serializer(self, assert_same_json):
+        assert_same_json(CartSerializer, FastCartSerializer, baker.make(Cart), many=False)
+
+    def test_orders_match_order_serializer(self, assert_same_json):
+        with_details = baker.make(User).customer
+        with_details.phone = '123'
+        with_details.birth_date = '1990-01-02'
+        with_details.save()
+        for customer in [with_details, baker.make(User).customer]:
+            order = baker.make(Order, customer=customer, total=Decimal('7.5'))
+            baker.make(OrderItem, order=order, unit_price=Decimal('2.5'), quantity=3)
+
+        assert_same_json(OrderSerializer, FastOrderSerializer,
+                         Order.objects.prefetch_related('items__product'), many=True)
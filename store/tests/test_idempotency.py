@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from model_bakery import baker
+from store.models import Cart, CartItem, IdempotentRequest, Order, Product
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+User = settings.AUTH_USER_MODEL
+
+
+def make_cart(quantity=1):
+    cart = baker.make(Cart)
+    baker.make(CartItem, cart=cart, product=baker.make(Product, inventory=10),
+               quantity=quantity)
+    return cart
+
+
+@pytest.fixture
+def create_order(api_client):
+    def do_create_order(cart_id, key):
+        return api_client.post('/store/orders/', {'cart_id': cart_id},
+                               HTTP_IDEMPOTENCY_KEY=key)
+    return do_create_order
+
+
+@pytest.mark.django_db
+class TestIdempotentCreateOrder:
+    def test_retries_replay_the_original_response(self, authenticate, create_order):
+        cart = make_cart()
+        authenticate(baker.make(User))
+
+        first = create_order(cart.id, 'key')
+        retry = create_order(cart.id, 'key')
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json() == first.json()
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert Order.objects.count() == 1
+
+    def test_keys_are_scoped_to_the_user(self, api_client, authenticate, create_order):
+        authenticate(baker.make(User))
+        create_order(make_cart().id, 'key')
+        authenticate(baker.make(User))
+
+        response = create_order(make_cart().id, 'key')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.count() == 2
+
+    def test_if_key_was_used_for_another_request_returns_422(self, authenticate, create_order):
+        authenticate(baker.make(User))
+        create_order(make_cart().id, 'key')
+
+        response = create_order(make_cart().id, 'key')
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert Order.objects.count() == 1
+
+    def test_failed_requests_release_the_key(self, authenticate, create_order):
+        cart = baker.make(Cart)
+        authenticate(baker.make(User))
+        assert create_order(cart.id, 'key').status_code == status.HTTP_400_BAD_REQUEST
+        baker.make(CartItem, cart=cart, product=baker.make(Product, inventory=10), quantity=1)
+
+        response = create_order(cart.id, 'key')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_expired_keys_are_claimed_again(self, authenticate, create_order):
+        cart = make_cart()
+        authenticate(baker.make(User))
+        create_order(cart.id, 'key')
+        IdempotentRequest.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        response = create_order(cart.id, 'key')
+
+        # The cart was turned into the first order.
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestIdempotentCreateCartItem:
+    def test_retries_do_not_add_the_quantity_twice(self, api_client):
+        cart = baker.make(Cart)
+        product = baker.make(Product)
+
+        for _ in range(2):
+            response = api_client.post(f'/store/carts/{cart.id}/items/',
+                                       {'product_id': product.id, 'quantity': 2},
+                                       HTTP_IDEMPOTENCY_KEY='key')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert CartItem.objects.get(cart=cart).quantity == 2
+
+
+@pytest.mark.django_db
+class TestPurgeIdempotencyKeys:
+    def test_deletes_only_expired_keys(self):
+        baker.make(IdempotentRequest, _quantity=3)
+        IdempotentRequest.objects.filter(pk__in=IdempotentRequest.objects.values('pk')[:2]) \
+                                 .update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command('purge_idempotency_keys', batch_size=1)
+
+        assert IdempotentRequest.objects.count() == 1
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite',
+                    reason='SQLite has no row locks, concurrent writers fail instead of waiting.')
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentRetries:
+    def test_exactly_one_order_is_created(self):
+        cart = make_cart()
+        client = APIClient()
+        client.force_authenticate(baker.make(User))
+
+        def retry(_):
+            try:
+                return client.post('/store/orders/', {'cart_id': cart.id},
+                                   HTTP_IDEMPOTENCY_KEY='key')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(retry, range(16)))
+
+        assert [response.status_code for response in responses] == \
+            [status.HTTP_201_CREATED] * 16
+        assert len({response.json()['id'] for response in responses}) == 1
+        assert Order.objects.count() == 1
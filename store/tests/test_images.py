@@ -0,0 +1,127 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from model_bakery import baker
+from PIL import Image
+from store.images import generate_variants
+from store.models import Product, ProductImage
+
+
+def image_file(name='photo.png', size=(1200, 800), format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def upload(api_client):
+    def do_upload(product):
+        return api_client.post(f'/store/products/{product.id}/images/',
+                               {'image': image_file()}, format='multipart')
+    return do_upload
+
+
+@pytest.mark.django_db
+class TestUploadProductImage:
+    def test_resizing_is_enqueued_after_commit(self, upload, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = upload(baker.make(Product))
+
+        assert response.status_code == 201
+        assert response.data['variants'] == {}
+        assert len(callbacks) == 1
+
+    def test_product_returns_variant_urls_once_resized(
+            self, settings, api_client, upload, django_capture_on_commit_callbacks):
+        settings.IMAGE_VARIANT_WORKERS = 0
+        product = baker.make(Product)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            upload(product)
+
+        response = api_client.get(f'/store/products/{product.id}/')
+        variants = response.data['images'][0]['variants']
+        assert set(variants) == {'thumbnail', 'medium'}
+        assert variants['thumbnail']['webp'].startswith('http://testserver/')
+        assert variants['thumbnail']['webp'].endswith('.webp')
+
+
+@pytest.mark.django_db
+class TestGenerateVariants:
+    def test_resizes_to_every_size_and_format(self, media_root):
+        image = ProductImage.objects.create(product=baker.make(Product), image=image_file())
+
+        variants = generate_variants(image.id)
+
+        image.refresh_from_db()
+        assert image.variants == variants
+        with Image.open(media_root / variants['thumbnail']['jpeg']) as thumbnail:
+            assert (thumbnail.format, thumbnail.size) == ('JPEG', (160, 107))
+        with Image.open(media_root / variants['medium']['webp']) as medium:
+            assert (medium.format, medium.size) == ('WEBP', (640, 427))
+
+    def test_regenerating_deletes_the_previous_variants(
+            self, media_root, django_capture_on_commit_callbacks):
+        image = ProductImage.objects.create(product=baker.make(Product), image=image_file())
+        previous = generate_variants(image.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            current = generate_variants(image.id)
+
+        assert previous['thumbnail']['jpeg'] != current['thumbnail']['jpeg']
+        assert not (media_root / previous['thumbnail']['jpeg']).exists()
+        assert (media_root / current['thumbnail']['jpeg']).exists()
+
+    def test_deleting_image_deletes_its_variants(
+            self, media_root, django_capture_on_commit_callbacks):
+        image = ProductImage.objects.create(product=baker.make(Product), image=image_file())
+        variants = generate_variants(image.id)
+        image.refresh_from_db()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            image.delete()
+
+        assert not (media_root / variants['medium']['webp']).exists()
+
+    def test_replacing_image_deletes_its_variants(
+            self, media_root, api_client, django_capture_on_commit_callbacks):
+        product = baker.make(Product)
+        image = ProductImage.objects.create(product=product, image=image_file())
+        variants = generate_variants(image.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.patch(f'/store/products/{product.id}/images/{image.id}/',
+                                        {'image': image_file()}, format='multipart')
+
+        assert response.status_code == 200
+        assert not (media_root / variants['medium']['webp']).exists()
+
+    def test_deleted_image_is_skipped(self):
+        image = ProductImage.objects.create(product=baker.make(Product), image=image_file())
+        image.delete()
+
+        assert generate_variants(image.id) is None
+
+
+@pytest.mark.django_db
+class TestGenerateImageVariants:
+    def test_resizes_only_pending_images(self):
+        product = baker.make(Product)
+        pending = ProductImage.objects.create(product=product, image=image_file())
+        done = ProductImage.objects.create(product=product, image=image_file(),
+                                           variants={'thumbnail': {'jpeg': 'done.jpg'}})
+
+        call_command('generate_image_variants', workers=0)
+
+        pending.refresh_from_db()
+        done.refresh_from_db()
+        assert set(pending.variants) == {'thumbnail', 'medium'}
+        assert done.variants == {'thumbnail': {'jpeg': 'done.jpg'}}
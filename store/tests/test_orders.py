@@ -0,0 +1,308 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+from store.archive import TABLE, is_partitioned
+from store.models import ArchivedOrder, Cart, CartItem, DailySales, Order, OrderItem, Product
+from store.views import OrderViewSet
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+User = settings.AUTH_USER_MODEL
+
+
+@pytest.fixture
+def create_order(api_client):
+    def do_create_order(cart_id):
+        return api_client.post('/store/orders/', {'cart_id': cart_id})
+    return do_create_order
+
+
+@pytest.mark.django_db
+class TestCreateOrder:
+    def test_if_user_is_anonymous_returns_401(self, create_order):
+        cart = baker.make(Cart)
+
+        response = create_order(cart.id)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_cart_does_not_exist_returns_400(self, authenticate, create_order):
+        authenticate(baker.make(User))
+
+        response = create_order('00000000-0000-0000-0000-000000000000')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['cart_id'] == ['No cart with the given ID was found.']
+
+    def test_if_cart_is_empty_returns_400(self, authenticate, create_order):
+        cart = baker.make(Cart)
+        authenticate(baker.make(User))
+
+        response = create_order(cart.id)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['cart_id'] == ['The cart is empty.']
+
+    def test_if_cart_is_valid_reserves_inventory(self, authenticate, create_order):
+        product = baker.make(Product, inventory=5)
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, product=product, quantity=2)
+        authenticate(baker.make(User))
+
+        response = create_order(cart.id)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['items'][0]['quantity'] == 2
+        assert Product.objects.get(pk=product.id).inventory == 3
+        assert not Cart.objects.filter(pk=cart.id).exists()
+
+    def test_if_inventory_is_short_returns_400(self, authenticate, create_order):
+        in_stock = baker.make(Product, inventory=5)
+        short = baker.make(Product, inventory=1)
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, product=in_stock, quantity=1)
+        baker.make(CartItem, cart=cart, product=short, quantity=2)
+        authenticate(baker.make(User))
+
+        response = create_order(cart.id)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert short.title in response.data['cart_id'][0]
+        assert Product.objects.get(pk=in_stock.id).inventory == 5
+        assert Cart.objects.filter(pk=cart.id).exists()
+        assert not Order.objects.exists()
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite',
+                    reason='SQLite has no row locks, concurrent writers fail instead of waiting.')
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentCreateOrder:
+    def test_inventory_is_never_oversold(self):
+        stock, buyers = 5, 40
+        products = baker.make(Product, inventory=stock, _quantity=2)
+        clients = []
+        for _ in range(buyers):
+            cart = baker.make(Cart)
+            for product in products:
+                baker.make(CartItem, cart=cart, product=product, quantity=1)
+            client = APIClient()
+            client.force_authenticate(baker.make(User))
+            clients.append((client, cart.id))
+
+        def buy(client_and_cart):
+            client, cart_id = client_and_cart
+            try:
+                return client.post('/store/orders/', {'cart_id': cart_id}).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            status_codes = list(executor.map(buy, clients))
+
+        assert status_codes.count(status.HTTP_201_CREATED) == stock
+        assert status_codes.count(status.HTTP_400_BAD_REQUEST) == buyers - stock
+        assert Order.objects.count() == stock
+        assert set(Product.objects.values_list('inventory', flat=True)) == {0}
+        assert DailySales.objects.get().orders == stock
+
+
+@pytest.fixture
+def list_orders(api_client):
+    def do_list_orders():
+        return api_client.get('/store/orders/')
+    return do_list_orders
+
+
+def make_order(customer, items=2):
+    order = baker.make(Order, customer=customer)
+    baker.make(OrderItem, order=order, _quantity=items)
+    return order
+
+
+@pytest.mark.django_db
+class TestListOrders:
+    def test_if_user_is_anonymous_returns_401(self, list_orders):
+        response = list_orders()
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_user_is_customer_returns_own_orders(self, authenticate, list_orders):
+        user = baker.make(User)
+        order = make_order(user.customer)
+        make_order(baker.make(User).customer)
+        authenticate(user)
+
+        response = list_orders()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [order['id'] for order in response.data] == [order.id]
+
+    def test_invoice_amount_is_the_stored_total(self, authenticate, create_order, list_orders):
+        product = baker.make(Product, inventory=5, unit_price=Decimal('2.50'))
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, product=product, quantity=3)
+        authenticate(baker.make(User))
+
+        create_order(cart.id)
+        response = list_orders()
+
+        assert Order.objects.get().total == Decimal('7.50')
+        assert response.data[0]['invoice_amount'] == Decimal('7.50')
+
+    @pytest.mark.parametrize('orders', [1, 10])
+    def test_runs_constant_number_of_queries(self, authenticate, list_orders,
+                                             django_assert_num_queries, orders):
+        for _ in range(orders):
+            make_order(baker.make(User).customer, items=3)
+        authenticate(baker.make(User, is_staff=True))
+
+        # Orders with customers and users, their items and the products.
+        with django_assert_num_queries(3):
+            response = list_orders()
+
+        assert len(response.data) == orders
+
+    def test_customer_is_resolved_from_cache(self, authenticate, list_orders,
+                                             django_assert_num_queries):
+        user = baker.make(User)
+        make_order(user.customer, items=3)
+        authenticate(user)
+        list_orders()
+
+        # Orders with customers and users, their items and the products.
+        with django_assert_num_queries(3):
+            response = list_orders()
+
+        assert len(response.data) == 1
+
+
+@pytest.mark.django_db
+class TestRecomputeOrderTotals:
+    def test_sets_total_from_items(self):
+        order = baker.make(Order, customer=baker.make(User).customer)
+        baker.make(OrderItem, order=order, quantity=2, unit_price=Decimal('1.25'))
+        baker.make(OrderItem, order=order, quantity=1, unit_price=Decimal('3'))
+
+        call_command('recompute_order_totals')
+
+        order.refresh_from_db()
+        assert order.total == Decimal('5.50')
+
+
+@pytest.mark.django_db
+class TestStreamOrders:
+    def test_streams_the_same_orders_as_the_list(self, api_client, authenticate, monkeypatch):
+        monkeypatch.setattr(OrderViewSet, 'stream_chunk_size', 2)
+        for _ in range(5):
+            make_order(baker.make(User).customer)
+        authenticate(baker.make(User, is_staff=True))
+
+        listed = api_client.get('/store/orders/')
+        streamed = api_client.get('/store/orders/', {'stream': 'true'})
+
+        assert streamed.streaming
+        assert json.loads(b''.join(streamed.streaming_content)) == listed.json()
+
+    def test_streams_an_empty_list(self, api_client, authenticate):
+        authenticate(baker.make(User, is_staff=True))
+
+        response = api_client.get('/store/orders/', {'stream': 'true'})
+
+        assert b''.join(response.streaming_content) == b'[]'
+
+
+def make_old_order(customer, days=800):
+    order = make_order(customer)
+    Order.objects.filter(pk=order.pk).update(placed_at=timezone.now() - timedelta(days=days))
+    order.refresh_from_db()
+    return order
+
+
+@pytest.mark.django_db
+class TestArchiveOrders:
+    def test_moves_old_orders_to_the_archive(self):
+        old = make_old_order(baker.make(User).customer)
+        recent = make_order(baker.make(User).customer)
+        items = {item.id: item for item in old.items.select_related('product')}
+
+        call_command('archive_orders', months=12)
+
+        assert list(Order.objects.values_list('id', flat=True)) == [recent.id]
+        assert not OrderItem.objects.filter(order_id=old.id).exists()
+        archived = ArchivedOrder.objects.get()
+        assert (archived.id, archived.placed_at, archived.customer_id) == \
+            (old.id, old.placed_at, old.customer_id)
+        for item in archived.items:
+            assert item['unit_price'] == str(items[item['id']].unit_price)
+            assert item['product']['unit_price'] == str(items[item['id']].product.unit_price)
+
+    def test_list_without_a_date_range_reads_only_the_order_tables(self, api_client, authenticate):
+        make_old_order(baker.make(User).customer)
+        recent = make_order(baker.make(User).customer)
+        call_command('archive_orders', months=12)
+        authenticate(baker.make(User, is_staff=True))
+
+        response = api_client.get('/store/orders/')
+
+        assert [order['id'] for order in response.data] == [recent.id]
+
+    def test_list_with_a_date_range_includes_archived_orders(self, api_client, authenticate):
+        user = baker.make(User)
+        old = make_old_order(user.customer)
+        recent = make_order(user.customer)
+        make_old_order(baker.make(User).customer)
+        call_command('archive_orders', months=12)
+        authenticate(user)
+
+        since = (old.placed_at - timedelta(days=1)).isoformat()
+        response = api_client.get('/store/orders/', {'placed_at__gte': since})
+
+        assert [order['id'] for order in response.data] == [old.id, recent.id]
+        authenticate(user)
+        before = api_client.get('/store/orders/', {'placed_at__lt': recent.placed_at.isoformat()})
+        assert [order['id'] for order in before.data] == [old.id]
+
+    def test_archived_orders_render_like_orders(self, api_client, authenticate):
+        user = baker.make(User)
+        old = make_old_order(user.customer)
+        authenticate(user)
+        before = api_client.get(f'/store/orders/{old.id}/').json()
+        call_command('archive_orders', months=12)
+
+        response = api_client.get(f'/store/orders/{old.id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == before
+
+    def test_archived_orders_of_others_are_not_found(self, api_client, authenticate):
+        old = make_old_order(baker.make(User).customer)
+        call_command('archive_orders', months=12)
+        authenticate(baker.make(User))
+
+        response = api_client.get(f'/store/orders/{old.id}/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql',
+                    reason='The archive is only partitioned on Postgres.')
+@pytest.mark.django_db
+class TestArchivePartitions:
+    def test_orders_are_archived_into_monthly_partitions(self):
+        old = make_old_order(baker.make(User).customer)
+
+        call_command('archive_orders', months=12)
+
+        partition = f'{TABLE}_{old.placed_at:%Y_%m}'
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {partition}')
+            assert cursor.fetchall() == [(old.id,)]
+        assert is_partitioned(connection)
@@ -0,0 +1,233 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+from store.models import Collection, Product, Review
+from rest_framework import status
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.fixture
+def list_products(api_client):
+    def do_list_products(params=None):
+        return api_client.get('/store/products/', params)
+    return do_list_products
+
+
+@pytest.mark.django_db
+class TestListProductsWithCursor:
+    def test_returns_first_page_without_count(self, list_products):
+        baker.make(Product, _quantity=15)
+
+        response = list_products({'pagination': 'cursor'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert len(response.data['results']) == 10
+        assert response.data['next'] is not None
+
+    def test_next_link_continues_after_last_id(self, api_client, list_products):
+        baker.make(Product, _quantity=15)
+
+        first_page = list_products({'pagination': 'cursor'})
+        second_page = api_client.get(first_page.data['next'])
+
+        first_ids = [product['id'] for product in first_page.data['results']]
+        second_ids = [product['id'] for product in second_page.data['results']]
+        assert len(second_ids) == 5
+        assert min(second_ids) > max(first_ids)
+        assert second_page.data['next'] is None
+
+    def test_page_size_is_capped(self, list_products):
+        baker.make(Product, _quantity=105, _bulk_create=True)
+
+        response = list_products({'pagination': 'cursor', 'page_size': 1000})
+
+        assert len(response.data['results']) == 100
+
+    def test_works_with_filters(self, list_products):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection, _quantity=3)
+        baker.make(Product, _quantity=3)
+
+        response = list_products(
+            {'pagination': 'cursor', 'collection_id': collection.id})
+
+        assert len(response.data['results']) == 3
+
+    def test_does_not_run_count_query(self, list_products, django_assert_num_queries):
+        baker.make(Product, _quantity=15)
+
+        with django_assert_num_queries(2) as captured:
+            list_products({'pagination': 'cursor'})
+
+        assert not any('COUNT' in query['sql'] for query in captured)
+
+    def test_pages_through_search_results_by_id(self, api_client, list_products):
+        apples = [baker.make(Product, title=f'Apple {i}') for i in range(12)]
+        baker.make(Product, title='Pear')
+
+        first_page = list_products({'pagination': 'cursor', 'search': 'apple'})
+        second_page = api_client.get(first_page.data['next'])
+
+        ids = [product['id'] for page in (first_page, second_page)
+               for product in page.data['results']]
+        assert ids == [apple.id for apple in apples]
+        assert second_page.data['next'] is None
+
+
+@pytest.mark.django_db
+class TestSearchProducts:
+    def test_returns_products_matching_title_or_description(self, list_products):
+        baker.make(Product, title='Red apple')
+        baker.make(Product, title='Pear', description='Not an apple')
+        baker.make(Product, title='Banana')
+
+        response = list_products({'search': 'apple'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+
+    def test_without_search_returns_all_products(self, list_products):
+        baker.make(Product, _quantity=3)
+
+        response = list_products({'search': ''})
+
+        assert response.data['count'] == 3
+
+
+@pytest.mark.django_db
+class TestFilterProducts:
+    def test_in_stock_returns_products_with_inventory(self, list_products):
+        in_stock = baker.make(Product, inventory=5)
+        baker.make(Product, inventory=0)
+
+        response = list_products({'in_stock': 'true'})
+
+        assert [product['id'] for product in response.data['results']] == [in_stock.id]
+
+
+@pytest.mark.django_db
+class TestListProductsWithReviewSummary:
+    def test_returns_summary_of_reviews(self, list_products):
+        product = baker.make(Product)
+        baker.make(Review, product=product, rating=4)
+        baker.make(Review, product=product, rating=5)
+
+        response = list_products()
+
+        assert response.data['results'][0]['reviews_count'] == 2
+        assert response.data['results'][0]['average_rating'] == Decimal('4.5')
+
+    def test_ten_pages_do_not_query_reviews(self, list_products, django_assert_num_queries):
+        for product in baker.make(Product, _quantity=100):
+            baker.make(Review, product=product, rating=3, _quantity=2)
+
+        # COUNT(*), the page and its images, whatever the number of reviews.
+        with django_assert_num_queries(10 * 3) as captured:
+            for page in range(1, 11):
+                assert list_products({'page': page}).data['results'][0]['reviews_count'] == 2
+
+        assert not any('store_review' in query['sql'] for query in captured)
+
+
+@pytest.fixture
+def catalog_file(tmp_path):
+    def do_catalog_file(name, content):
+        path = tmp_path / name
+        path.write_text(content)
+        return str(path)
+    return do_catalog_file
+
+
+@pytest.mark.django_db
+class TestImportProducts:
+    def test_creates_and_updates_products_by_title(self, catalog_file):
+        fruits = baker.make(Collection, title='Fruits')
+        baker.make(Product, title='Apple', inventory=1, unit_price=1)
+        path = catalog_file('products.csv', (
+            'title,description,inventory,unit_price,collection\n'
+            'Apple,Red,10,2.50,Fruits\n'
+            'Pear,,5,1.20,Fruits\n'
+        ))
+
+        call_command('import_products', path, stdout=None)
+
+        apple = Product.objects.get(title='Apple')
+        assert (apple.inventory, apple.unit_price) == (10, Decimal('2.50'))
+        assert apple.collection_id == fruits.id
+        assert Product.objects.get(title='Pear').description == ''
+        fruits.refresh_from_db()
+        assert fruits.products_count == 2
+
+    def test_reads_jsonl_in_batches(self, catalog_file):
+        baker.make(Collection, title='Fruits')
+        path = catalog_file('products.jsonl', ''.join(
+            json.dumps({'title': f'Product {i}', 'inventory': i,
+                        'unit_price': '1.00', 'collection': 'Fruits'}) + '\n'
+            for i in range(5)))
+
+        call_command('import_products', path, batch_size=2, stdout=None)
+
+        assert Product.objects.count() == 5
+
+    def test_if_row_is_invalid_imports_nothing(self, catalog_file):
+        baker.make(Collection, title='Fruits')
+        path = catalog_file('products.csv', (
+            'title,description,inventory,unit_price,collection\n'
+            'Apple,,10,2.50,Fruits\n'
+            'Pear,,5,1.20,Vegetables\n'
+        ))
+
+        with pytest.raises(CommandError, match='Row 2'):
+            call_command('import_products', path, batch_size=1, atomic=True, stdout=None)
+
+        assert not Product.objects.exists()
+
+    def test_if_row_is_invalid_keeps_committed_batches(self, catalog_file):
+        fruits = baker.make(Collection, title='Fruits')
+        path = catalog_file('products.csv', (
+            'title,description,inventory,unit_price,collection\n'
+            'Apple,,10,2.50,Fruits\n'
+            'Pear,,5,1.20,Vegetables\n'
+        ))
+
+        with pytest.raises(CommandError, match='Row 2'):
+            call_command('import_products', path, batch_size=1, stdout=None)
+
+        assert list(Product.objects.values_list('title', flat=True)) == ['Apple']
+        fruits.refresh_from_db()
+        assert fruits.products_count == 1
+
+    def test_counts_rows_merged_by_title(self, catalog_file):
+        baker.make(Collection, title='Fruits')
+        path = catalog_file('products.csv', (
+            'title,description,inventory,unit_price,collection\n'
+            'Apple,,10,2.50,Fruits\n'
+            'Apple,,5,1.20,Fruits\n'
+        ))
+        stdout = io.StringIO()
+
+        call_command('import_products', path, stdout=stdout)
+
+        assert 'Imported 1 product(s), merging 1 row(s)' in stdout.getvalue()
+
+
+@pytest.mark.django_db
+class TestExportProducts:
+    def test_output_can_be_imported(self, catalog_file, tmp_path):
+        collection = baker.make(Collection, title='Fruits')
+        baker.make(Product, title='Apple', inventory=3, unit_price=Decimal('2.50'),
+                   collection=collection)
+        path = str(tmp_path / 'products.jsonl')
+
+        call_command('export_products', path, stdout=None)
+        Product.objects.update(inventory=0)
+        call_command('import_products', path, stdout=None)
+
+        with open(path) as file:
+            assert json.loads(file.readline())['unit_price'] == '2.50'
+        assert Product.objects.get(title='Apple').inventory == 3
@@ -0,0 +1,112 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from store.models import Cart, CartItem, Collection, Customer, Order, OrderItem, Product, Review
+
+# Runs EXPLAIN on every query of the store read endpoints over a seeded
+# Postgres database, and fails on sequential scans of the large tables.
+# Lists without filters read whole tables by design and are not checked.
+pytestmark = [
+    pytest.mark.skipif(connection.vendor != 'postgresql', reason='needs PostgreSQL'),
+    pytest.mark.django_db,
+]
+
+User = get_user_model()
+
+LARGE_TABLES = {
+    'store_product',
+    'store_review',
+    'store_order',
+    'store_orderitem',
+    'store_cartitem',
+}
+
+PRODUCTS = 20_000
+COLLECTIONS = 20
+CUSTOMERS = 500
+CARTS = 2_000
+
+
+def seed():
+    collections = Collection.objects.bulk_create(
+        Collection(title=f'Collection {i}') for i in range(COLLECTIONS))
+    products = Product.objects.bulk_create(
+        Product(title=f'Product {i}', inventory=i % 2 * 10, unit_price=1 + i % 100,
+                collection=collections[i % COLLECTIONS])
+        for i in range(PRODUCTS))
+
+    users = User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@example.com') for i in range(CUSTOMERS))
+    customers = Customer.objects.bulk_create(Customer(user=user) for user in users)
+
+    Review.objects.bulk_create(
+        Review(product=products[i % PRODUCTS], user=users[i % CUSTOMERS], description='a',
+               rating=1 + i % 5)
+        for i in range(2 * PRODUCTS))
+    # `date` is auto_now_add, spread the reviews over a year.
+    for days in range(0, 365, 30):
+        Review.objects.filter(id__gt=days * 100, id__lte=(days + 30) * 100) \
+                      .update(date=date.today() - timedelta(days=days))
+
+    orders = Order.objects.bulk_create(
+        Order(customer=customers[i % CUSTOMERS]) for i in range(PRODUCTS))
+    OrderItem.objects.bulk_create(
+        OrderItem(order=orders[i % PRODUCTS], product=products[i % PRODUCTS],
+                  quantity=1, unit_price=1)
+        for i in range(2 * PRODUCTS))
+
+    carts = Cart.objects.bulk_create(Cart() for _ in range(CARTS))
+    CartItem.objects.bulk_create(
+        CartItem(cart=carts[i % CARTS], product=products[i], quantity=1)
+        for i in range(5 * CARTS))
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return collections[0], products[0], users[0], orders[0], carts[0]
+
+
+def sequential_scans(plan):
+    if plan['Node Type'] == 'Seq Scan' and plan['Relation Name'] in LARGE_TABLES:
+        yield plan['Relation Name']
+    for subplan in plan.get('Plans', []):
+        yield from sequential_scans(subplan)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        result = cursor.fetchone()[0]
+    plan = (json.loads(result) if isinstance(result, str) else result)[0]['Plan']
+    return list(sequential_scans(plan))
+
+
+class TestQueryPlans:
+    def test_read_endpoints_do_not_scan_large_tables(self, api_client, authenticate):
+        collection, product, user, order, cart = seed()
+        paths = [
+            f'/store/products/?collection_id={collection.id}&unit_price__gt=10&unit_price__lt=20',
+            f'/store/products/?collection_id={collection.id}&in_stock=true',
+            f'/store/products/{product.id}/',
+            f'/store/products/{product.id}/reviews/',
+            f'/store/collections/{collection.id}/',
+            f'/store/carts/{cart.id}/',
+            '/store/orders/',
+            f'/store/orders/{order.id}/',
+        ]
+        authenticate(user)
+
+        scans = {}
+        for path in paths:
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.get(path)
+            assert response.status_code == 200, path
+            for query in context.captured_queries:
+                if query['sql'].startswith('SELECT'):
+                    for table in explain(query['sql']):
+                        scans.setdefault(path, []).append(table)
+
+        assert scans == {}
@@ -1,5 +1,10 @@
+import io
+from datetime import date
+from decimal import Decimal
+
 import pytest
 from model_bakery import baker
+from django.core.management import call_command
 from store.models import Product, Review
 from rest_framework import status
 from django.conf import settings
@@ -52,6 +57,24 @@ class TestCreateReview:
         assert response.status_code == status.HTTP_201_CREATED
         assert response.data['id'] > 0
 
+    def test_if_rating_is_out_of_range_returns_400(self, authenticate, create_review):
+        product = baker.make(Product)
+        authenticate(baker.make(User))
+
+        response = create_review(product.id, {'description': 'a', 'rating': 6})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'rating' in response.data
+
+    def test_if_rating_is_valid_returns_201(self, authenticate, create_review):
+        product = baker.make(Product)
+        authenticate(baker.make(User))
+
+        response = create_review(product.id, {'description': 'a', 'rating': 4})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['rating'] == 4
+
 
 @pytest.mark.django_db
 class TestRetrieveReview:
@@ -72,3 +95,70 @@ class TestRetrieveReview:
 
         assert response.status_code == status.HTTP_200_OK
         assert response.data['id'] == review.id
+
+
+@pytest.mark.django_db
+class TestReviewSummary:
+    def test_is_updated_when_reviews_are_added_and_removed(self, authenticate, create_review):
+        product = baker.make(Product)
+        authenticate(baker.make(User))
+        create_review(product.id, {'description': 'a', 'rating': 5})
+        create_review(product.id, {'description': 'b', 'rating': 2})
+
+        product.refresh_from_db()
+        assert (product.reviews_count, product.average_rating) == (2, Decimal('3.5'))
+        assert product.last_review_date == date.today()
+
+        product.reviews.filter(rating=5).delete()
+
+        product.refresh_from_db()
+        assert (product.reviews_count, product.average_rating) == (1, 2)
+
+    def test_reviews_without_rating_are_left_out_of_the_average(self, authenticate,
+                                                                create_review):
+        product = baker.make(Product)
+        authenticate(baker.make(User))
+        create_review(product.id, {'description': 'a'})
+
+        product.refresh_from_db()
+        assert (product.reviews_count, product.average_rating) == (1, None)
+
+        create_review(product.id, {'description': 'b', 'rating': 4})
+
+        product.refresh_from_db()
+        assert (product.reviews_count, product.average_rating) == (2, 4)
+
+    def test_is_updated_when_rating_is_added_and_removed(self):
+        review = baker.make(Review, rating=None)
+        review.rating = 2
+        review.save()
+
+        review.product.refresh_from_db()
+        assert (review.product.ratings_count, review.product.ratings_total) == (1, 2)
+
+        review.rating = None
+        review.save()
+
+        review.product.refresh_from_db()
+        assert (review.product.ratings_count, review.product.ratings_total) == (0, 0)
+
+    def test_is_updated_when_rating_changes(self):
+        review = baker.make(Review, rating=1)
+        review.rating = 3
+        review.save()
+
+        review.product.refresh_from_db()
+        assert review.product.ratings_total == 3
+
+    def test_reconcile_fixes_drifted_products(self):
+        product = baker.make(Product)
+        baker.make(Review, product=product, rating=4, _quantity=2)
+        baker.make(Review, product=product, rating=None)
+        Product.objects.filter(pk=product.pk).update(
+            reviews_count=0, ratings_count=0, ratings_total=0, last_review_date=None)
+
+        call_command('reconcile_review_summaries', stdout=io.StringIO())
+
+        product.refresh_from_db()
+        assert (product.reviews_count, product.ratings_count, product.ratings_total) == (3, 2, 8)
+        assert product.last_review_date == date.today()
@@ -0,0 +1,191 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from model_bakery import baker
+from store.models import (
+    Cart,
+    CartItem,
+    Collection,
+    DailyCollectionSales,
+    DailyProductSales,
+    DailySales,
+    Order,
+    Product,
+)
+from rest_framework import status
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.utils import timezone
+
+User = settings.AUTH_USER_MODEL
+
+
+@pytest.fixture
+def place_order(api_client, authenticate, django_capture_on_commit_callbacks):
+    def do_place_order(*quantities_and_products):
+        cart = baker.make(Cart)
+        for quantity, product in quantities_and_products:
+            baker.make(CartItem, cart=cart, product=product, quantity=quantity)
+        authenticate(baker.make(User))
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/store/orders/', {'cart_id': cart.id})
+        assert response.status_code == status.HTTP_201_CREATED
+        return response
+    return do_place_order
+
+
+@pytest.fixture
+def get_report(api_client, authenticate):
+    def do_get_report(**params):
+        authenticate(baker.make(User, is_staff=True))
+        return api_client.get('/store/sales/', params)
+    return do_get_report
+
+
+@pytest.fixture
+def products():
+    books, games = baker.make(Collection, _quantity=2)
+    return [
+        baker.make(Product, collection=books, inventory=10, unit_price=Decimal('2.50')),
+        baker.make(Product, collection=books, inventory=10, unit_price=Decimal('4')),
+        baker.make(Product, collection=games, inventory=10, unit_price=Decimal('10')),
+    ]
+
+
+def sales(model, **filters):
+    return list(model.objects
+                     .filter(**filters)
+                     .order_by('id')
+                     .values_list('revenue', 'units', 'orders'))
+
+
+@pytest.mark.django_db
+class TestRecordSales:
+    def test_placed_orders_are_added_to_the_rollups(self, place_order, products):
+        first, second, third = products
+
+        place_order((2, first), (1, second), (1, third))
+        place_order((1, first))
+
+        assert sales(DailyProductSales, product=first) == [(Decimal('7.50'), 3, 2)]
+        assert sales(DailyProductSales, product=third) == [(Decimal('10'), 1, 1)]
+        assert sales(DailyCollectionSales, collection=first.collection) == \
+            [(Decimal('11.50'), 4, 2)]
+        assert sales(DailySales) == [(Decimal('21.50'), 5, 2)]
+
+    def test_rollup_command_recomputes_the_same_rollups(self, place_order, products):
+        first, second, third = products
+        place_order((2, first), (1, second), (1, third))
+        place_order((1, first))
+        recorded = [sales(model) for model in
+                    (DailyProductSales, DailyCollectionSales, DailySales)]
+        DailySales.objects.all().delete()
+        DailyProductSales.objects.update(units=0)
+
+        call_command('rollup_sales')
+
+        assert [sales(model) for model in
+                (DailyProductSales, DailyCollectionSales, DailySales)] == recorded
+
+    def test_rollup_command_keeps_sales_in_the_collection_they_were_made_in(
+            self, place_order, products):
+        first, _, third = products
+        place_order((2, first))
+        recorded = sales(DailyCollectionSales, collection=first.collection)
+
+        first.collection = third.collection
+        first.save()
+        call_command('rollup_sales')
+
+        assert sales(DailyCollectionSales, collection=first.collection_id) == []
+        assert sales(DailyCollectionSales, collection=products[1].collection) == recorded
+
+    def test_if_rollups_cannot_be_updated_order_is_placed(self, place_order, products,
+                                                          monkeypatch, caplog):
+        def increment(model, rows):
+            raise DatabaseError('locked')
+        monkeypatch.setattr('store.sales.increment', increment)
+
+        response = place_order((1, products[0]))
+
+        assert Order.objects.filter(pk=response.data['id']).exists()
+        assert 'Could not add order' in caplog.text
+
+    def test_rollup_command_skips_days_with_archived_orders(self):
+        old = baker.make(Order, customer=baker.make(User).customer)
+        Order.objects.filter(pk=old.pk).update(placed_at=timezone.now() - timedelta(days=800))
+        call_command('archive_orders', months=12)
+        day = timezone.localdate() - timedelta(days=800)
+        baker.make(DailySales, day=day, revenue=5, units=1, orders=1)
+
+        call_command('rollup_sales', since=day)
+
+        assert sales(DailySales, day=day) == [(Decimal('5'), 1, 1)]
+
+
+@pytest.mark.django_db
+class TestSalesReport:
+    def test_if_user_is_not_staff_returns_403(self, api_client, authenticate):
+        authenticate(baker.make(User))
+
+        response = api_client.get('/store/sales/')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_period_is_invalid_returns_400(self, get_report):
+        response = get_report(period='month')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_totals(self, get_report):
+        today = timezone.localdate()
+        baker.make(DailySales, day=today, revenue=5, units=2, orders=1)
+        baker.make(DailySales, day=today - timedelta(days=1), revenue=3, units=1, orders=1)
+
+        response = get_report(since=today)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{'revenue': 5.0, 'units': 2, 'orders': 1}]
+
+    def test_grouped_by_week_and_collection(self, get_report):
+        monday = date(2024, 1, 1)
+        collection = baker.make(Collection)
+        for day, revenue in [(monday, 1), (monday + timedelta(days=6), 2),
+                             (monday + timedelta(days=7), 4)]:
+            baker.make(DailyCollectionSales, day=day, collection=collection,
+                       revenue=revenue, units=1, orders=1)
+
+        response = get_report(period='week', by='collection')
+
+        assert response.json() == [
+            {'week': '2024-01-01', 'collection': {'id': collection.id, 'title': collection.title},
+             'revenue': 3.0, 'units': 2, 'orders': 2},
+            {'week': '2024-01-08', 'collection': {'id': collection.id, 'title': collection.title},
+             'revenue': 4.0, 'units': 1, 'orders': 1},
+        ]
+
+    def test_sales_of_deleted_products_are_reported(self, get_report):
+        baker.make(DailyProductSales, day=timezone.localdate(), product_id=404,
+                   revenue=1, units=1, orders=1)
+
+        response = get_report(period='day', by='product')
+
+        assert response.json()[0]['product'] == {'id': 404, 'title': None}
+
+    def test_runs_constant_number_of_queries(self, api_client, authenticate,
+                                             django_assert_num_queries):
+        today = timezone.localdate()
+        for product in baker.make(Product, _quantity=10):
+            for days in range(30):
+                baker.make(DailyProductSales, day=today - timedelta(days=days), product=product,
+                           revenue=1, units=1, orders=1)
+
+        authenticate(baker.make(User, is_staff=True))
+
+        # The rollup rows, then the product titles.
+        with django_assert_num_queries(2):
+            response = api_client.get('/store/sales/', {'by': 'product'})
+
+        assert [row['units'] for row in response.data] == [30] * 10
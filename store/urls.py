@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework_nested import routers
 from . import views
 
@@ -19,4 +20,7 @@ products_router.register(
     'reviews', views.ReviewViewSet, basename='product-reviews')
 
 # URLConf
-urlpatterns = router.urls + carts_router.urls + products_router.urls
+urlpatterns = router.urls + carts_router.urls + products_router.urls + [
+    path('cache-stats/', views.CacheStatsView.as_view()),
+    path('sales/', views.SalesReportView.as_view()),
+]
@@ -1,12 +1,13 @@
-from django.db.models.aggregates import Count
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
 from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
 from rest_framework.mixins import (
     CreateModelMixin,
     DestroyModelMixin,
@@ -15,10 +16,14 @@ from rest_framework.mixins import (
     UpdateModelMixin,
 )
 
+from core.authentication import StatelessReadMixin
+from core.routers import ReplicaReadMixin
+
 from .serializers import (
     CollectionSerializer,
     ProductSerializer,
     CartSerializer,
+    CartItemBulkSerializer,
     CartItemCreateSerializer,
     CartItemSerializer,
     CartItemUpdateSerializer,
@@ -27,6 +32,8 @@ from .serializers import (
     OrderSerializer,
     ProductImageSerializer,
     ReviewSerializer,
+    SalesReportQuerySerializer,
+    SalesSerializer,
 )
 from .models import (
     Collection,
@@ -35,35 +42,69 @@ from .models import (
     CartItem,
     Customer,
     Order,
+    ArchivedOrder,
     ProductImage,
     Review,
 )
-from .paginations import DefaultPagination
+from .paginations import DefaultPagination, KeysetPagination
 from .permissions import IsAdminOrReadOnly, IsOwnerOrReadOnly
-from .filters import ProductFilter
+from .filters import ArchivedOrderFilter, OrderFilter, ProductFilter, ProductSearchFilter
+from .caches import CachedResponseMixin, stats
+from .customers import get_customer, get_customer_id
+from .idempotency import idempotent
+from .sales import report
+from .streaming import StreamingListMixin
+from .fast_serializers import (
+    FastArchivedOrderSerializer,
+    FastCartSerializer,
+    FastOrderSerializer,
+    FastProductSerializer,
+)
 
 
-class CollectionViewSet(ModelViewSet):
-    queryset = Collection.objects.annotate(products_count=Count('products'))
+class CollectionViewSet(StatelessReadMixin, CachedResponseMixin, ModelViewSet):
+    cache_namespace = 'collections'
+    queryset = Collection.objects.all()
     serializer_class = CollectionSerializer
     permission_classes = [IsAdminOrReadOnly]
 
     def destroy(self, request, *args, **kwargs):
-        if Product.objects.filter(collection_id=kwargs['pk']):
+        collection = self.get_object()
+        if collection.products_count > 0:
             return Response({'detail': 'Collection cannot be deleted, because it includes one or more products.'},
                             status=status.HTTP_405_METHOD_NOT_ALLOWED)
-        return super().destroy(request, *args, **kwargs)
+        self.perform_destroy(collection)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ProductViewSet(ModelViewSet):
-    queryset = Product.objects.prefetch_related('images')
+class ProductViewSet(StatelessReadMixin, CachedResponseMixin, ModelViewSet):
+    cache_namespace = 'products'
+    queryset = Product.objects.defer('search_vector').prefetch_related('images')
     serializer_class = ProductSerializer
     pagination_class = DefaultPagination
     permission_classes = [IsAdminOrReadOnly]
-    filter_backends = [SearchFilter, DjangoFilterBackend]
+    filter_backends = [ProductSearchFilter, DjangoFilterBackend]
     search_fields = ['title', 'description']
     filterset_class = ProductFilter
 
+    def get_serializer_class(self):
+        if self.action == 'list' and self.request.method == 'GET':
+            return FastProductSerializer
+        return ProductSerializer
+
+    @property
+    def paginator(self):
+        # `?pagination=cursor` switches to keyset pagination, which skips
+        # the COUNT(*) and OFFSET scan of page number pagination. Its pages
+        # are ordered by id, search results included: `?search=` then only
+        # filters, without the ranking of ProductSearchFilter.
+        if not hasattr(self, '_paginator'):
+            if self.request.query_params.get('pagination') == 'cursor':
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
 
 class CartViewSet(CreateModelMixin,
                   RetrieveModelMixin,
@@ -72,6 +113,11 @@ class CartViewSet(CreateModelMixin,
     queryset = Cart.objects.prefetch_related('items__product')
     serializer_class = CartSerializer
 
+    def get_serializer_class(self):
+        if self.action == 'retrieve' and self.request.method == 'GET':
+            return FastCartSerializer
+        return CartSerializer
+
 
 class CartItemViewSet(ModelViewSet):
     # We do not allow PUT request.
@@ -92,18 +138,48 @@ class CartItemViewSet(ModelViewSet):
     def get_serializer_context(self):
         return {'cart_id': self.kwargs['cart_pk']}
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        Cart.objects.touch(self.kwargs['cart_pk'])
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        Cart.objects.touch(self.kwargs['cart_pk'])
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        Cart.objects.touch(self.kwargs['cart_pk'])
+
+    @action(detail=False, methods=['POST'])
+    def bulk(self, request, cart_pk):
+        cart = get_object_or_404(Cart, pk=cart_pk)
+        serializer = CartItemBulkSerializer(
+            data=request.data, context={'cart_id': cart.id})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        Cart.objects.touch(cart.id)
+        cart = Cart.objects.prefetch_related('items__product').get(pk=cart.id)
+        serializer = CartSerializer(cart)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
-class CustomerViewSet(ListModelMixin,
+class CustomerViewSet(StatelessReadMixin,
+                      StreamingListMixin,
+                      ListModelMixin,
                       RetrieveModelMixin,
                       UpdateModelMixin,
                       GenericViewSet):
-    queryset = Customer.objects.all()
+    queryset = Customer.objects.select_related('user')
     serializer_class = CustomerSerializer
     permission_classes = [IsAdminUser]
 
     @action(detail=False, methods=['GET', 'PATCH', 'PUT'], permission_classes=[IsAuthenticated])
     def me(self, request):
-        customer = Customer.objects.get(user=request.user)
+        customer = get_customer(request)
         if request.method == 'GET':
             serializer = CustomerSerializer(customer)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -114,20 +190,59 @@ class CustomerViewSet(ListModelMixin,
             return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class OrderViewSet(CreateModelMixin,
+class OrderViewSet(StatelessReadMixin,
+                   StreamingListMixin,
+                   CreateModelMixin,
                    ListModelMixin,
                    RetrieveModelMixin,
                    DestroyModelMixin,
                    GenericViewSet):
+    # Orders moved to the archive by archive_orders are only read when the
+    # list asks for a date range, or when an order is not found otherwise.
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = OrderFilter
+
     def get_queryset(self):
         user = self.request.user
+        queryset = Order.objects \
+                        .select_related('customer__user') \
+                        .prefetch_related('items__product')
         if user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(user=user)
+            return queryset
+        return queryset.filter(customer_id=get_customer_id(self.request))
+
+    def get_archived_queryset(self):
+        queryset = ArchivedOrder.objects \
+                                .select_related('customer__user') \
+                                .order_by('placed_at', 'id')
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(customer_id=get_customer_id(self.request))
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        params = request.query_params
+        if not isinstance(response, Response) \
+                or not ('placed_at__gte' in params or 'placed_at__lt' in params):
+            return response
+        archived = ArchivedOrderFilter(
+            params, queryset=self.get_archived_queryset(), request=request).qs
+        # Archived orders are older than any order still in the order tables.
+        response.data = FastArchivedOrderSerializer(archived, many=True).data + response.data
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            order = get_object_or_404(self.get_archived_queryset(), pk=kwargs['pk'])
+            return Response(FastArchivedOrderSerializer(order).data)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return OrderCreateSerializer
+        elif self.action == 'list':
+            return FastOrderSerializer
         return OrderSerializer
 
     def get_permissions(self):
@@ -135,16 +250,17 @@ class OrderViewSet(CreateModelMixin,
             return [IsAdminUser()]
         return [IsAuthenticated()]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         serializer = OrderCreateSerializer(
-            data=request.data, context={'user': self.request.user})
+            data=request.data, context={'customer_id': get_customer_id(request)})
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
-        serializer = OrderSerializer(order)
+        serializer = OrderSerializer(self.get_queryset().get(pk=order.pk))
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ProductImageViewSet(ModelViewSet):
+class ProductImageViewSet(StatelessReadMixin, ReplicaReadMixin, ModelViewSet):
     serializer_class = ProductImageSerializer
 
     def get_serializer_context(self):
@@ -154,15 +270,36 @@ class ProductImageViewSet(ModelViewSet):
         return ProductImage.objects.filter(product_id=self.kwargs['product_pk'])
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(StatelessReadMixin, ReplicaReadMixin, ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
     def get_queryset(self):
-        return Review.objects.filter(product_id=self.kwargs['product_pk'])
+        return Review.objects \
+                     .filter(product_id=self.kwargs['product_pk']) \
+                     .order_by('-date', '-id')
 
     def get_serializer_context(self):
         return {
             'product_id': self.kwargs['product_pk'],
             'user': self.request.user
         }
+
+
+class SalesReportView(StatelessReadMixin, ReplicaReadMixin, APIView):
+    # Revenue, units and orders from the sales rollups, grouped by
+    # ?period=day|week and ?by=product|collection between ?since and ?until.
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        query = SalesReportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        rows = report(**query.validated_data)
+        return Response(SalesSerializer(rows, many=True).data, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(dict(stats), status=status.HTTP_200_OK)